@@ -0,0 +1,172 @@
+"""Benchmark harness for the LogAn parsers.
+
+Generates a synthetic log (see generate.py), runs every engine on it in a
+fresh process and reports lines/sec, MB/sec and peak RSS. Results are
+saved as JSON; pass an earlier result file with --compare to spot
+regressions. --scaling instead shows how the parallel parser scales with
+the number of workers, and --startup times short cli.py runs.
+
+Usage: python benchmark.py [--lines N] [--noise 0.1] [--engines a,b] [--output FILE]
+                           [--compare FILE] [--scaling] [--max-workers N] [--startup]
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from generate import generate_log
+from index import (log_pattern, timestamp_format, parse_log_file, analyze_log_data,
+                   iter_log_chunks, count_chunks, count_log_parallel)
+
+def run_parse(log_file):
+    return parse_log_file(log_file, log_pattern)
+
+def run_analyze(log_file):
+    log_data = parse_log_file(log_file, log_pattern)
+    start = time.perf_counter() #only the analysis is timed.
+    analyze_log_data(log_data, timestamp_format)
+    return time.perf_counter() - start
+
+def run_stream(log_file):
+    return count_chunks(iter_log_chunks(log_file, log_pattern, timestamp_format=timestamp_format))
+
+def run_vectorized(log_file):
+    return parse_log_file(log_file, log_pattern, vectorized=True, timestamp_format=timestamp_format)
+
+def run_mmap(log_file):
+    return parse_log_file(log_file, log_pattern, use_mmap=True)
+
+def run_parallel(log_file):
+    return count_log_parallel(log_file, log_pattern)
+
+ENGINES = {'parse_log_file': run_parse, 'analyze_log_data': run_analyze, 'stream': run_stream,
+           'vectorized': run_vectorized, 'mmap': run_mmap, 'parallel': run_parallel}
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its finished children, in MB."""
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / 1024 if sys.platform != 'darwin' else peak / 1024 ** 2 #KB on Linux, bytes on macOS.
+
+def warm_up():
+    """Imports pandas, which index.py only imports on first use, so timings don't include it."""
+    import pandas
+
+def measure(engine, log_file):
+    """Runs one engine (in a fresh worker process) and returns its time and peak RSS."""
+    warm_up()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = ENGINES[engine](log_file)
+    elapsed = time.perf_counter() - start
+    if engine == 'analyze_log_data':
+        elapsed = result
+    return elapsed, peak_rss_mb()
+
+def run_benchmarks(log_file, lines, engines):
+    """Benchmarks each engine in its own spawned process so peak RSS isn't shared."""
+    size_mb = os.path.getsize(log_file) / 1e6
+    results = []
+    for engine in engines:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            seconds, rss = pool.submit(measure, engine, log_file).result()
+        results.append({'engine': engine, 'seconds': round(seconds, 4),
+                        'lines_per_sec': round(lines / seconds), 'mb_per_sec': round(size_mb / seconds, 2),
+                        'peak_rss_mb': round(rss, 1)})
+    return results
+
+def print_results(results, previous=None):
+    """Prints a result table, with the speed ratio to an earlier run if given."""
+    before = {r['engine']: r for r in (previous or {}).get('results', [])}
+    print(f"{'engine':18s} {'seconds':>9s} {'lines/s':>11s} {'MB/s':>8s} {'peak MB':>8s}")
+    for r in results:
+        line = (f"{r['engine']:18s} {r['seconds']:9.3f} {r['lines_per_sec']:11d} "
+                f"{r['mb_per_sec']:8.2f} {r['peak_rss_mb']:8.1f}")
+        if r['engine'] in before:
+            line += f"  {before[r['engine']]['seconds'] / r['seconds']:5.2f}x vs previous"
+        print(line)
+
+def run_scaling(log_file, max_workers):
+    """Shows the speedup of the parallel parser for 1, 2, 4, ... workers."""
+    size_mb = os.path.getsize(log_file) / 1e6
+    warm_up()
+    start = time.perf_counter()
+    serial = count_chunks(iter_log_chunks(log_file, log_pattern))
+    serial_time = time.perf_counter() - start
+    print(f"serial     {serial_time:8.2f}s  {size_mb / serial_time:8.1f} MB/s")
+
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        result = count_log_parallel(log_file, log_pattern, workers)
+        elapsed = time.perf_counter() - start
+        same = (result[0] == serial[0] and result[1].sort_index().equals(serial[1].sort_index())
+                and result[2].sort_index().equals(serial[2].sort_index()))
+        print(f"{workers:3d} workers {elapsed:8.2f}s  {size_mb / elapsed:8.1f} MB/s"
+              f"  speedup {serial_time / elapsed:5.2f}x  {'ok' if same else 'MISMATCH'}")
+        workers *= 2
+
+def run_startup(repeat=10):
+    """Times whole `cli.py count` runs on the tiny example log, stdlib vs pandas path."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    cli = [sys.executable, os.path.join(here, 'cli.py'), 'count', os.path.join(here, 'example.log')]
+    commands = {'count': cli, 'count --pandas': cli + ['--pandas'],
+                'import pandas/matplotlib/seaborn': [sys.executable, '-c',
+                                                     'import pandas, matplotlib.pyplot, seaborn']}
+    for name, command in commands.items():
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        print(f"{name:34s} median {statistics.median(times) * 1000:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LogAn parsers on a synthetic log.")
+    parser.add_argument('--lines', type=int, default=1000000)
+    parser.add_argument('--noise', type=float, default=0.1, help="fraction of non-matching lines")
+    parser.add_argument('--engines', default=','.join(ENGINES), help="comma-separated engine names")
+    parser.add_argument('--output', default='benchmark.json', help="where to save the results")
+    parser.add_argument('--compare', help="earlier result file to compare against")
+    parser.add_argument('--scaling', action='store_true', help="only run the worker scaling benchmark")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--startup', action='store_true', help="only time cli.py startup")
+    args = parser.parse_args()
+    if args.startup:
+        run_startup()
+        return
+
+    log_file = os.path.join(tempfile.mkdtemp(), 'benchmark.log')
+    generate_log(log_file, args.lines, noise=args.noise, seed=0)
+    print(f"{args.lines} lines, {os.path.getsize(log_file) / 1e6:.1f} MB\n")
+    try:
+        if args.scaling:
+            run_scaling(log_file, args.max_workers)
+            return
+        results = run_benchmarks(log_file, args.lines, args.engines.split(','))
+        previous = None
+        if args.compare:
+            with open(args.compare, 'r') as f:
+                previous = json.load(f)
+        print_results(results, previous)
+        with open(args.output, 'w') as f:
+            json.dump({'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                       'machine': platform.platform(), 'cpus': os.cpu_count(), 'lines': args.lines,
+                       'noise': args.noise, 'bytes': os.path.getsize(log_file), 'results': results},
+                      f, indent=2)
+        print(f"\nSaved results to {args.output}")
+    finally:
+        os.remove(log_file)
+
+if __name__ == '__main__':
+    main()
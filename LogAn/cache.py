@@ -0,0 +1,74 @@
+"""On-disk cache of parsed LogAn frames.
+
+A parsed frame is stored as a Feather file named after a hash of the log's
+path, size, mtime and the parse pattern, so repeat analyses of an unchanged
+log reload typed columns instead of re-parsing the text. Feather needs
+pyarrow; without it the cache falls back to pickle files.
+
+Usage: python cache.py LOG_FILE [--cache-dir DIR] [--clear]
+"""
+import argparse
+import hashlib
+import importlib.util
+import os
+import shutil
+import time
+
+from index import log_pattern, timestamp_format, parse_log_file, analyze_log_data
+
+CACHE_DIR = '.logan_cache'
+
+#checked without importing pyarrow (or pandas), so cache_key stays cheap to use.
+CACHE_EXT = '.feather' if importlib.util.find_spec('pyarrow') else '.pkl'
+
+def cache_key(log_file, log_pattern, timestamp_format=None):
+    """Fingerprints a log file and the settings used to parse it."""
+    stat = os.stat(log_file)
+    fingerprint = '\0'.join([os.path.abspath(log_file), str(stat.st_size), str(stat.st_mtime_ns),
+                             log_pattern, timestamp_format or ''])
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def cache_path(log_file, log_pattern, timestamp_format=None, cache_dir=CACHE_DIR):
+    """Returns the cache file a log's parsed frame is stored in."""
+    return os.path.join(cache_dir, cache_key(log_file, log_pattern, timestamp_format) + CACHE_EXT)
+
+def load_log_frame(log_file, log_pattern, timestamp_format=None, cache_dir=CACHE_DIR):
+    """Returns the parsed frame of a log file, reading it from the cache when possible."""
+    import pandas as pd
+    path = cache_path(log_file, log_pattern, timestamp_format, cache_dir)
+    if os.path.exists(path):
+        return pd.read_feather(path) if CACHE_EXT == '.feather' else pd.read_pickle(path)
+
+    #the vectorized parser already returns categorical/datetime64 columns.
+    df = parse_log_file(log_file, log_pattern, vectorized=True, timestamp_format=timestamp_format)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + '.tmp'
+    if CACHE_EXT == '.feather':
+        df.to_feather(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path) #never leave a half-written cache file behind.
+    return df
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Deletes every cached frame."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a log file through the parse cache.")
+    parser.add_argument('log_file')
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--timestamp-format', default=timestamp_format)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--clear', action='store_true', help="empty the cache first")
+    args = parser.parse_args()
+    if args.clear:
+        clear_cache(args.cache_dir)
+
+    start = time.perf_counter()
+    df = load_log_frame(args.log_file, args.pattern, args.timestamp_format, args.cache_dir)
+    print(f"Loaded {len(df)} rows in {time.perf_counter() - start:.3f}s\n")
+    analyze_log_data(df)
+
+if __name__ == '__main__':
+    main()
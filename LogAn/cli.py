@@ -0,0 +1,133 @@
+"""Command line entry point for LogAn.
+
+    python cli.py count LOG_FILE           level counts
+    python cli.py hourly LOG_FILE          log lines per hour of the day
+    python cli.py plot LOG_FILE [--out D]  charts on screen, or as files in D
+    python cli.py search LOG_FILE WORD...  indexed search, see search.py
+
+count and hourly run on the standard library alone unless --pandas is
+given; pandas, matplotlib and seaborn are only imported by the subcommands
+that use them, so a quick count starts in a few tens of milliseconds.
+"""
+import argparse
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+
+from index import log_pattern, timestamp_format, open_log_file
+
+def iter_fields(log_file, log_pattern):
+    """Yields the named groups of every matching line as a dict."""
+    pattern = re.compile(log_pattern)
+    with open_log_file(log_file) as f:
+        for line in f:
+            match = pattern.search(line)
+            if match:
+                yield match.groupdict()
+
+def count_levels(log_file, log_pattern):
+    """Counts lines per level with the standard library only."""
+    return Counter(fields.get('level') for fields in iter_fields(log_file, log_pattern))
+
+def count_hours(log_file, log_pattern, timestamp_format=None):
+    """Counts lines per hour of the day with the standard library only."""
+    counts = Counter()
+    for fields in iter_fields(log_file, log_pattern):
+        try:
+            if timestamp_format:
+                timestamp = datetime.strptime(fields['timestamp'], timestamp_format)
+            else:
+                timestamp = datetime.fromisoformat(fields['timestamp'])
+        except (KeyError, TypeError, ValueError):
+            continue #same as pd.to_datetime(errors='coerce') then dropna.
+        counts[timestamp.hour] += 1
+    return counts
+
+def print_counts(title, key, counts):
+    """Prints counts in the same layout as the pandas reports."""
+    print(f"{title}:\n {key}")
+    width = max((len(str(name)) for name, _ in counts), default=0)
+    for name, count in counts:
+        print(f"{str(name):{width}s}    {count}")
+
+def cmd_count(args):
+    if args.pandas:
+        from index import analyze_log_stream, iter_log_chunks
+        analyze_log_stream(iter_log_chunks(args.log_file, args.pattern, timestamp_format=args.timestamp_format))
+        return
+    counts = count_levels(args.log_file, args.pattern)
+    if not counts:
+        print("No log data to analyze.")
+        return
+    print_counts("Log Level Counts", 'level', counts.most_common())
+
+def cmd_hourly(args):
+    if args.pandas:
+        from index import analyze_log_stream, iter_log_chunks
+        analyze_log_stream(iter_log_chunks(args.log_file, args.pattern, timestamp_format=args.timestamp_format))
+        return
+    counts = count_hours(args.log_file, args.pattern, args.timestamp_format)
+    if not counts:
+        print("No log data to analyze.")
+        return
+    print_counts("Hourly Log Counts", 'hour', sorted(counts.items()))
+
+def cmd_plot(args):
+    if args.out:
+        from render import render_charts
+        from rollup import load_rollup
+        rollup = load_rollup(args.log_file, args.pattern, args.timestamp_format)
+        if rollup.empty:
+            print("No log data to analyze.")
+            return
+        for path in render_charts(rollup, args.out, args.format.split(',')):
+            print(path)
+        return
+    from index import parse_log_file, analyze_log_data, visualize_log_data
+    df = parse_log_file(args.log_file, args.pattern, vectorized=True, timestamp_format=args.timestamp_format)
+    visualize_log_data(analyze_log_data(df, args.timestamp_format))
+
+def cmd_search(args):
+    from search import search
+    for line in search(args.log_file, args.pattern, args.terms, args.level, args.since, args.until,
+                       args.timestamp_format):
+        print(line)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='logan', description="Analyze log files.")
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--timestamp-format', default=timestamp_format)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    count = subparsers.add_parser('count', help="count lines per level")
+    count.add_argument('log_file')
+    count.add_argument('--pandas', action='store_true', help="use the pandas pipeline")
+    count.set_defaults(func=cmd_count)
+
+    hourly = subparsers.add_parser('hourly', help="count lines per hour of the day")
+    hourly.add_argument('log_file')
+    hourly.add_argument('--pandas', action='store_true', help="use the pandas pipeline")
+    hourly.set_defaults(func=cmd_hourly)
+
+    plot = subparsers.add_parser('plot', help="plot level and hourly charts")
+    plot.add_argument('log_file')
+    plot.add_argument('--out', help="write image files to this directory instead of showing them")
+    plot.add_argument('--format', default='png', help="comma-separated: png, svg, pdf")
+    plot.set_defaults(func=cmd_plot)
+
+    search = subparsers.add_parser('search', help="find lines by words, level and time window")
+    search.add_argument('log_file')
+    search.add_argument('terms', nargs='*', help="words the message must contain")
+    search.add_argument('--level', help="only lines of this level")
+    search.add_argument('--since', type=datetime.fromisoformat, help="start time, e.g. '2023-10-27 10:00'")
+    search.add_argument('--until', type=datetime.fromisoformat, help="end time (inclusive)")
+    search.set_defaults(func=cmd_search)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Incremental follow mode for LogAn.
+
+Each run parses only the bytes appended since the previous run and folds
+them into the level/hourly counts kept in a small JSON state file, along
+with the byte offset, inode and size used to detect rotation.
+
+Usage: python follow.py LOG_FILE [--state FILE] [--interval SECONDS] [--once]
+"""
+import argparse
+import json
+import os
+import time
+
+import pandas as pd
+
+from index import log_pattern, parse_lines_in_chunks, count_chunks, merge_counts, report_counts
+
+def new_state(log_pattern):
+    """Returns the state of a log that hasn't been read yet."""
+    return {'pattern': log_pattern, 'inode': None, 'offset': 0, 'size': 0,
+            'level_counts': {}, 'hourly_counts': {}}
+
+def load_state(state_file, log_pattern):
+    """Loads the saved state, starting over if it is missing or for another pattern."""
+    try:
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return new_state(log_pattern)
+    if state.get('pattern') != log_pattern:
+        return new_state(log_pattern)
+    return state
+
+def save_state(state_file, state):
+    """Writes the state to a temp file and renames it over the old one."""
+    tmp_file = state_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+def iter_complete_lines(f, state):
+    """Yields the complete lines after the saved offset, advancing it as it goes.
+
+    A trailing line without a newline is still being written, so it is left
+    for the next run.
+    """
+    for line in f:
+        if not line.endswith(b'\n'):
+            break
+        state['offset'] += len(line)
+        yield line.decode().replace('\r\n', '\n')
+
+def update_state(log_file, state, chunk_size=100000):
+    """Parses the bytes appended since the last run into the state; returns the new row count."""
+    stat = os.stat(log_file)
+    if stat.st_ino != state['inode'] or stat.st_size < state['offset']:
+        #the log was rotated or truncated: read the new file from the start.
+        state['inode'], state['offset'] = stat.st_ino, 0
+
+    with open(log_file, 'rb') as f:
+        f.seek(state['offset'])
+        lines = iter_complete_lines(f, state)
+        new_rows, level_counts, hourly_counts = count_chunks(
+            parse_lines_in_chunks(lines, state['pattern'], chunk_size))
+    state['size'] = stat.st_size
+
+    stored_levels, stored_hours = state_counts(state)
+    level_counts = merge_counts(stored_levels, level_counts)
+    hourly_counts = merge_counts(stored_hours, hourly_counts)
+    state['level_counts'] = {level: int(count) for level, count in level_counts.items()}
+    state['hourly_counts'] = {str(hour): int(count) for hour, count in hourly_counts.items()}
+    return new_rows
+
+def state_counts(state):
+    """Returns the stored counts as the (level_counts, hourly_counts) Series pair."""
+    level_counts = pd.Series(state['level_counts'], dtype='int64')
+    hourly_counts = pd.Series({int(hour): count for hour, count in state['hourly_counts'].items()},
+                              dtype='int64')
+    return level_counts, hourly_counts
+
+def follow(log_file, log_pattern, state_file, interval=5.0, once=False):
+    """Keeps the counts of a growing log up to date, printing them after each change."""
+    state = load_state(state_file, log_pattern)
+    while True:
+        new_rows = update_state(log_file, state)
+        save_state(state_file, state)
+        if new_rows or once:
+            print(f"\n{new_rows} new log lines at offset {state['offset']}")
+            report_counts(*state_counts(state))
+        if once:
+            return state
+        time.sleep(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally analyze a growing log file.")
+    parser.add_argument('log_file')
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--state', help="state file (default: LOG_FILE.state.json)")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between checks")
+    parser.add_argument('--once', action='store_true', help="update once and exit")
+    args = parser.parse_args()
+    try:
+        follow(args.log_file, args.pattern, args.state or args.log_file + '.state.json',
+               args.interval, args.once)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Synthetic log generator for LogAn.
+
+Writes log files in the format of the example log_pattern, with a
+configurable size, mix of levels and share of lines that don't match the
+pattern (stack traces, blank lines and other noise).
+
+Usage: python generate.py OUTPUT [--mb 100 | --lines N] [--levels INFO=70,WARNING=15,ERROR=10,DEBUG=5]
+                                 [--noise 0.1] [--seed N]
+"""
+import argparse
+import datetime
+import random
+
+DEFAULT_LEVELS = {'INFO': 70, 'WARNING': 15, 'ERROR': 10, 'DEBUG': 5}
+
+MESSAGES = ['User logged in', 'User logged out', 'Invalid input', 'Database connection failed',
+            'Process completed', 'File not found', 'Memory allocation error', 'System restart',
+            'System online', 'Request {id} served in {ms} ms', 'Cache miss for key {id}',
+            'Connection from 10.0.{a}.{b} closed', 'Job {id} retried {n} times']
+
+NOISE = ['Traceback (most recent call last):', '  File "app.py", line {n}, in handler',
+         '    raise ValueError("bad value {id}")', '', '----', 'at com.example.Service.run(Service.java:{n})']
+
+def fill(template, rng):
+    """Fills the numeric placeholders of a message template."""
+    return template.format(id=rng.randrange(100000), ms=rng.randrange(1, 2000), n=rng.randrange(1, 20),
+                           a=rng.randrange(256), b=rng.randrange(256))
+
+def generate_log(path, lines=None, size_mb=None, levels=None, noise=0.1, seed=None,
+                 start=datetime.datetime(2023, 10, 27)):
+    """Writes a synthetic log of the given number of lines or size; returns the line count."""
+    rng = random.Random(seed)
+    levels = levels or DEFAULT_LEVELS
+    level_names, level_weights = list(levels), list(levels.values())
+    max_bytes = int(size_mb * 1e6) if size_mb else None
+    max_lines = lines if lines is not None else (None if max_bytes else 100000)
+    written_lines = written_bytes = 0
+    now = start
+    with open(path, 'w') as f:
+        while (max_lines is None or written_lines < max_lines) and \
+                (max_bytes is None or written_bytes < max_bytes):
+            block = []
+            for level in rng.choices(level_names, level_weights, k=1000):
+                if rng.random() < noise:
+                    block.append(fill(rng.choice(NOISE), rng))
+                else:
+                    now += datetime.timedelta(seconds=rng.randrange(3))
+                    block.append(f"{now:%Y-%m-%d %H:%M:%S} {level} - {fill(rng.choice(MESSAGES), rng)}")
+            if max_lines is not None:
+                block = block[:max_lines - written_lines]
+            text = '\n'.join(block) + '\n'
+            f.write(text)
+            written_lines += len(block)
+            written_bytes += len(text)
+    return written_lines
+
+def parse_levels(text):
+    """Parses 'INFO=70,ERROR=10' into a level -> weight dict."""
+    levels = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        levels[name.strip()] = float(weight or 1)
+    return levels
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic log file.")
+    parser.add_argument('output')
+    parser.add_argument('--lines', type=int, help="number of lines to write")
+    parser.add_argument('--mb', type=float, help="approximate size in MB (instead of --lines)")
+    parser.add_argument('--levels', type=parse_levels, help="level weights, e.g. INFO=70,ERROR=10")
+    parser.add_argument('--noise', type=float, default=0.1, help="fraction of non-matching lines")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    count = generate_log(args.output, args.lines, args.mb, args.levels, args.noise, args.seed)
+    print(f"Wrote {count} lines to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,276 @@
+import bz2
+import gzip
+import lzma
+import mmap
+import os
 import re
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-def parse_log_file(log_file, log_pattern):
-    """Parses a log file based on a given regular expression pattern."""
+# pandas, matplotlib and seaborn are imported inside the functions that need
+# them, so importing this module (e.g. for a quick count) stays cheap.
+
+OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open}
+
+def open_log_file(log_file):
+    """Opens a log file for reading text, decompressing .gz/.bz2/.xz files on the fly."""
+    opener = OPENERS.get(os.path.splitext(log_file)[1].lower())
+    if opener:
+        return opener(log_file, 'rt')
+    return open(log_file, 'r')
+
+def parse_log_file(log_file, log_pattern, vectorized=False, timestamp_format=None, use_mmap=False):
+    """Parses a log file based on a given regular expression pattern.
+
+    With vectorized=True the whole file is matched in bulk with pandas and a
+    DataFrame with the same columns is returned instead of a list of dicts.
+    With use_mmap=True the file is scanned as bytes (see iter_mmap_entries).
+    """
+    if use_mmap:
+        return list(iter_mmap_entries(log_file, log_pattern))
+    if vectorized:
+        with open_log_file(log_file) as f:
+            return extract_lines(f.read().split('\n'), log_pattern, timestamp_format)
     log_entries = []
-    with open(log_file, 'r') as f:
+    with open_log_file(log_file) as f:
         for line in f:
             match = re.search(log_pattern, line)
             if match:
                 log_entries.append(match.groupdict()) #capture groups to a dictionary.
     return log_entries
 
-def analyze_log_data(log_data):
+def extract_lines(lines, log_pattern, timestamp_format=None):
+    """Matches a batch of raw lines at once with Series.str.extract.
+
+    Only the named groups are kept, as with match.groupdict(), and converted
+    by compact_log_frame. If a timestamp_format is given the timestamp column
+    is parsed with it, so no per-row format inference is needed.
+    """
+    import pandas as pd
+    names = list(re.compile(log_pattern).groupindex)
+    df = pd.Series(lines, dtype=object).str.extract(log_pattern, expand=True)
+    df = df[names].dropna(how='all').reset_index(drop=True) #drop non-matching lines.
+    return compact_log_frame(df, timestamp_format)
+
+def iter_mmap_entries(log_file, log_pattern):
+    """Scans a memory-mapped log file with a bytes regex, yielding dicts of matches.
+
+    The regex runs directly over the mapped buffer, so lines that don't match
+    are never copied or decoded; only the captured groups of matching lines
+    are. Each line still yields at most its first match, like re.search.
+    """
+    pattern = re.compile(log_pattern.encode(), re.MULTILINE)
+    names = list(pattern.groupindex)
+    with open(log_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return #empty files can't be mapped.
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos, size = 0, len(buf)
+            while pos < size:
+                match = pattern.search(buf, pos)
+                if not match:
+                    break
+                line_start = buf.rfind(b'\n', pos, match.start()) + 1 or pos
+                line_end = buf.find(b'\n', line_start)
+                if line_end == -1:
+                    line_end = size
+                text_end = line_end - 1 if buf[line_end - 1:line_end] == b'\r' else line_end
+                if match.end() > text_end:
+                    #the match ran past its line; redo it on the line alone.
+                    match = pattern.search(buf, line_start, text_end)
+                if match:
+                    yield {name: (value.decode() if value is not None else None)
+                           for name, value in zip(names, (match.group(name) for name in names))}
+                pos = line_end + 1
+
+def chunk_entries(entries, chunk_size=100000, timestamp_format=None):
+    """Groups dicts of matches into compact DataFrames of at most chunk_size rows."""
+    log_entries = []
+    for entry in entries:
+        log_entries.append(entry)
+        if len(log_entries) >= chunk_size:
+            yield compact_log_frame(log_entries, timestamp_format)
+            log_entries = []
+    if log_entries:
+        yield compact_log_frame(log_entries, timestamp_format)
+
+def parse_lines_in_chunks(lines, log_pattern, chunk_size=100000, timestamp_format=None):
+    """Matches an iterable of lines, yielding DataFrames of at most chunk_size rows."""
+    pattern = re.compile(log_pattern) #compile once instead of per line.
+    matches = (pattern.search(line) for line in lines)
+    yield from chunk_entries((match.groupdict() for match in matches if match), chunk_size, timestamp_format)
+
+def iter_log_chunks(log_file, log_pattern, chunk_size=100000, vectorized=False, timestamp_format=None,
+                    use_mmap=False):
+    """Parses a log file lazily, yielding DataFrames of at most chunk_size rows."""
+    if use_mmap:
+        yield from chunk_entries(iter_mmap_entries(log_file, log_pattern), chunk_size, timestamp_format)
+        return
+    with open_log_file(log_file) as f:
+        if not vectorized:
+            yield from parse_lines_in_chunks(f, log_pattern, chunk_size, timestamp_format)
+            return
+        while True:
+            lines = [line for _, line in zip(range(chunk_size), f)]
+            if not lines:
+                break
+            df = extract_lines(lines, log_pattern, timestamp_format)
+            if not df.empty:
+                yield df
+
+def compact_log_frame(df, timestamp_format=None, parse_timestamps=True):
+    """Converts a parsed frame to compact dtypes.
+
+    level and message become categoricals (each distinct string is stored
+    once), timestamp becomes datetime64 and hour, if present, int8.
+    """
+    import pandas as pd
+    df = pd.DataFrame(df)
+    for column in ('level', 'message'):
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    if parse_timestamps and 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format=timestamp_format, errors='coerce')
+    if 'hour' in df.columns:
+        df['hour'] = df['hour'].astype('int8')
+    return df
+
+def report_memory(log_data, timestamp_format=None):
+    """Prints the memory used per column by a plain and a compact frame of the same rows."""
+    import pandas as pd
+    plain = pd.DataFrame(log_data).astype(object) #one Python object per cell.
+    compact = compact_log_frame(plain, timestamp_format)
+    if 'timestamp' in plain.columns:
+        plain['timestamp'] = plain['timestamp'].astype(str).astype(object)
+        plain['hour'] = compact['timestamp'].dt.hour.astype('int64')
+        compact['hour'] = compact['timestamp'].dt.hour.astype('int8')
+    report = pd.DataFrame({'before': plain.memory_usage(deep=True, index=False),
+                           'after': compact.memory_usage(deep=True, index=False)}) / 1e6
+    report.loc['total'] = report.sum()
+    print("Memory usage (MB):\n", report.round(3))
+    return report
+
+def merge_counts(total, counts):
+    """Adds one partial value_counts() Series into a running total."""
+    return total.add(counts, fill_value=0).astype('int64')
+
+def count_chunk(df):
+    """Computes the level and hourly counts of a single parsed chunk."""
+    import pandas as pd
+    level_counts = pd.Series(dtype='int64')
+    hourly_counts = pd.Series(dtype='int64')
+    if 'level' in df.columns:
+        level_counts = df['level'].value_counts()
+    if 'timestamp' in df.columns:
+        hours = pd.to_datetime(df['timestamp'], errors='coerce').dt.hour.dropna()
+        hourly_counts = hours.astype('int64').value_counts()
+    return level_counts, hourly_counts
+
+def count_chunks(chunks):
+    """Folds the counts of parsed chunks together, one chunk at a time."""
+    import pandas as pd
+    level_counts = pd.Series(dtype='int64')
+    hourly_counts = pd.Series(dtype='int64')
+    total_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        chunk_levels, chunk_hours = count_chunk(chunk)
+        level_counts = merge_counts(level_counts, chunk_levels)
+        hourly_counts = merge_counts(hourly_counts, chunk_hours)
+    return total_rows, level_counts, hourly_counts
+
+def report_counts(level_counts, hourly_counts):
+    """Sorts and prints folded counts the same way analyze_log_data does."""
+    level_counts = level_counts.sort_values(ascending=False, kind='stable')
+    level_counts.index.name, level_counts.name = 'level', 'count'
+    hourly_counts = hourly_counts.sort_index()
+    hourly_counts.index.name, hourly_counts.name = 'hour', 'count'
+    print("Log Level Counts:\n", level_counts)
+    print("\nHourly Log Counts:\n", hourly_counts)
+    return level_counts, hourly_counts
+
+def analyze_log_stream(chunks):
+    """Analyzes parsed log chunks, folding the counts in one chunk at a time.
+
+    Only the running level/hourly counts are kept, so memory stays flat no
+    matter how many chunks the parser yields.
+    """
+    total_rows, level_counts, hourly_counts = count_chunks(chunks)
+    if not total_rows:
+        print("No log data to analyze.")
+        return None
+    return report_counts(level_counts, hourly_counts)
+
+def find_shard_offsets(log_file, shards):
+    """Splits a file into newline-aligned byte ranges [start, end)."""
+    size = os.path.getsize(log_file)
+    offsets = [0]
+    with open(log_file, 'rb') as f:
+        for i in range(1, shards):
+            pos = size * i // shards
+            if pos <= offsets[-1]:
+                continue
+            f.seek(pos - 1)
+            f.readline() #move to the start of the next full line.
+            if f.tell() >= size:
+                break
+            offsets.append(f.tell())
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+def iter_shard_lines(log_file, start, end):
+    """Yields the decoded lines that begin inside the byte range [start, end)."""
+    with open(log_file, 'rb') as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line.decode().replace('\r\n', '\n') #same newlines as text mode.
+
+def count_shard(log_file, log_pattern, start, end, chunk_size=100000):
+    """Worker: parses one byte range and returns its partial counts."""
+    lines = iter_shard_lines(log_file, start, end)
+    return count_chunks(parse_lines_in_chunks(lines, log_pattern, chunk_size))
+
+def count_log_parallel(log_file, log_pattern, workers=None, chunk_size=100000):
+    """Counts a log file on a process pool, one newline-aligned shard per worker."""
+    from concurrent.futures import ProcessPoolExecutor
+    import pandas as pd
+    workers = workers or os.cpu_count() or 1
+    shards = find_shard_offsets(log_file, workers)
+    level_counts = pd.Series(dtype='int64')
+    hourly_counts = pd.Series(dtype='int64')
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(count_shard, log_file, log_pattern, start, end, chunk_size)
+                   for start, end in shards]
+        for future in futures:
+            shard_rows, shard_levels, shard_hours = future.result()
+            total_rows += shard_rows
+            level_counts = merge_counts(level_counts, shard_levels)
+            hourly_counts = merge_counts(hourly_counts, shard_hours)
+    return total_rows, level_counts, hourly_counts
+
+def analyze_log_parallel(log_file, log_pattern, workers=None, chunk_size=100000):
+    """Analyzes a log file on a process pool of the given number of workers.
+
+    The partial level/hourly counts of every shard are merged, so the result
+    matches analyze_log_stream on the same file.
+    """
+    total_rows, level_counts, hourly_counts = count_log_parallel(
+        log_file, log_pattern, workers, chunk_size)
+    if not total_rows:
+        print("No log data to analyze.")
+        return None
+    return report_counts(level_counts, hourly_counts)
+
+def analyze_log_data(log_data, timestamp_format=None):
     """Analyzes the parsed log data using pandas."""
+    import pandas as pd
     df = pd.DataFrame(log_data)
     if not df.empty: #handle empty dataframes.
+        df = compact_log_frame(df, parse_timestamps=False) #categorical level/message.
         # Example: Count occurrences of different log levels
         if 'level' in df.columns:
             level_counts = df['level'].value_counts()
@@ -25,8 +279,8 @@ def analyze_log_data(log_data):
         # Example: Basic time-based analysis (if timestamps are present)
         if 'timestamp' in df.columns:
             try:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                df['hour'] = df['timestamp'].dt.hour
+                df['timestamp'] = pd.to_datetime(df['timestamp'], format=timestamp_format)
+                df['hour'] = df['timestamp'].dt.hour.astype('int8')
                 hourly_counts = df['hour'].value_counts().sort_index()
                 print("\nHourly Log Counts:\n", hourly_counts)
                 return df #returning df for visualization.
@@ -43,38 +297,49 @@ def analyze_log_data(log_data):
 def visualize_log_data(df):
     """Visualizes the analyzed log data."""
     if df is not None:
-        if 'level' in df.columns:
-            plt.figure(figsize=(8, 6))
-            sns.countplot(x='level', data=df)
-            plt.title('Log Level Distribution')
-            plt.show()
-
-        if 'hour' in df.columns:
-            plt.figure(figsize=(12, 6))
-            sns.lineplot(x=df['hour'].value_counts().sort_index().index, y=df['hour'].value_counts().sort_index().values)
-            plt.title('Hourly Log Activity')
-            plt.xlabel('Hour')
-            plt.ylabel('Log Count')
-            plt.xticks(range(24))
-            plt.grid(True)
-            plt.show()
+        level_counts = df['level'].value_counts() if 'level' in df.columns else None
+        hourly_counts = df['hour'].value_counts().sort_index() if 'hour' in df.columns else None
+        visualize_log_counts(level_counts, hourly_counts)
+
+def visualize_log_counts(level_counts=None, hourly_counts=None):
+    """Visualizes already aggregated level and hourly counts."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if level_counts is not None:
+        plt.figure(figsize=(8, 6))
+        sns.barplot(x=level_counts.index.astype(str), y=level_counts.values)
+        plt.title('Log Level Distribution')
+        plt.xlabel('level')
+        plt.ylabel('count')
+        plt.show()
+
+    if hourly_counts is not None:
+        plt.figure(figsize=(12, 6))
+        sns.lineplot(x=hourly_counts.index, y=hourly_counts.values)
+        plt.title('Hourly Log Activity')
+        plt.xlabel('Hour')
+        plt.ylabel('Log Count')
+        plt.xticks(range(24))
+        plt.grid(True)
+        plt.show()
 
 # Example Usage (replace with your log file and pattern):
 log_file = 'example.log'  # Replace with your log file name
 log_pattern = r'(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (?P<level>\w+) - (?P<message>.*)' #example log pattern.
+timestamp_format = '%Y-%m-%d %H:%M:%S' #strftime format of the timestamp group above.
+
+if __name__ == '__main__':
+    # example.log ships next to this script; nothing is written to the input.
+    parsed_logs = parse_log_file(log_file, log_pattern)
+    analyzed_data = analyze_log_data(parsed_logs)
+    visualize_log_data(analyzed_data)
 
-# Create a dummy log file for testing.
-with open(log_file, 'w') as f:
-    f.write("2023-10-27 10:00:00 INFO - User logged in\n")
-    f.write("2023-10-27 10:15:00 WARNING - Invalid input\n")
-    f.write("2023-10-27 11:00:00 ERROR - Database connection failed\n")
-    f.write("2023-10-27 12:00:00 INFO - Process completed\n")
-    f.write("2023-10-27 12:30:00 INFO - User logged out\n")
-    f.write("2023-10-27 13:00:00 WARNING - File not found\n")
-    f.write("2023-10-27 13:15:00 ERROR - Memory allocation error\n")
-    f.write("2023-10-27 14:00:00 INFO - System restart\n")
-    f.write("2023-10-27 14:30:00 INFO - System online\n")
-
-parsed_logs = parse_log_file(log_file, log_pattern)
-analyzed_data = analyze_log_data(parsed_logs)
-visualize_log_data(analyzed_data)
\ No newline at end of file
+    # For multi-GB logs, stream fixed-size chunks instead (peak memory stays flat):
+    # level_counts, hourly_counts = analyze_log_stream(iter_log_chunks(log_file, log_pattern))
+    # or spread the file over every core: analyze_log_parallel(log_file, log_pattern, workers=8)
+    # or match all lines in bulk with pandas instead of one re.search per line:
+    # analyze_log_data(parse_log_file(log_file, log_pattern, vectorized=True, timestamp_format=timestamp_format))
+    # or scan a memory-mapped file as bytes, decoding matching lines only:
+    # analyze_log_data(parse_log_file(log_file, log_pattern, use_mmap=True))
+    # Compare memory of plain object columns with the compact dtypes:
+    # report_memory(parsed_logs, timestamp_format)
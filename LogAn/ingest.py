@@ -0,0 +1,95 @@
+"""Multi-file ingestion for LogAn.
+
+Takes files, directories and glob patterns, including rotated logs
+compressed with gzip, bz2 or xz, parses them concurrently on a process pool
+and merges everything into one time-ordered frame. Compressed files are
+decompressed as a stream and the inputs are only ever read. Hidden
+directories (such as LogAn's own .logan_cache) are not searched, and a
+file that can't be read or decoded is reported and skipped.
+
+Usage: python ingest.py PATH [PATH ...] [--workers N] [--plot]
+"""
+import argparse
+import glob
+import lzma
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cache import CACHE_DIR
+from index import (log_pattern, timestamp_format, iter_log_chunks, compact_log_frame,
+                   analyze_log_data, visualize_log_data)
+
+def expand_inputs(paths):
+    """Expands files, directories (recursively) and glob patterns to a sorted file list.
+
+    Hidden files and directories, and the cache directory, are skipped when walking a directory.
+    """
+    files = set()
+    for path in paths:
+        for match in glob.glob(path, recursive=True) or [path]:
+            if os.path.isdir(match):
+                for root, dirs, names in os.walk(match):
+                    #pruning dirs in place stops os.walk from descending into them.
+                    dirs[:] = [name for name in dirs if not name.startswith('.') and name != CACHE_DIR]
+                    files.update(os.path.join(root, name) for name in names if not name.startswith('.'))
+            elif os.path.isfile(match):
+                files.add(match)
+    return sorted(files)
+
+def parse_one(log_file, log_pattern, timestamp_format=None, chunk_size=100000):
+    """Worker: parses a single (possibly compressed) file into one frame.
+
+    Returns None for a file without log lines, or one that can't be read, so a
+    stray binary or broken archive doesn't abort the whole batch.
+    """
+    try:
+        chunks = list(iter_log_chunks(log_file, log_pattern, chunk_size, vectorized=True,
+                                      timestamp_format=timestamp_format))
+    except (OSError, EOFError, UnicodeDecodeError, lzma.LZMAError, zlib.error) as error:
+        print(f"skipping {log_file}: {error}", file=sys.stderr)
+        return None
+    if not chunks:
+        return None
+    df = pd.concat(chunks, ignore_index=True)
+    df['source'] = log_file
+    return df
+
+def load_logs(paths, log_pattern, timestamp_format=None, workers=None):
+    """Parses every input concurrently and returns one frame ordered by timestamp."""
+    files = expand_inputs(paths)
+    if not files:
+        return None
+    with ProcessPoolExecutor(max_workers=workers or min(len(files), os.cpu_count() or 1)) as pool:
+        frames = [df for df in pool.map(parse_one, files, [log_pattern] * len(files),
+                                        [timestamp_format] * len(files)) if df is not None]
+    if not frames:
+        return None
+    #categoricals from different files only concatenate as objects; encode them again.
+    df = compact_log_frame(pd.concat(frames, ignore_index=True), parse_timestamps=False)
+    df['source'] = df['source'].astype('category')
+    if 'timestamp' in df.columns:
+        df = df.sort_values('timestamp', kind='stable', ignore_index=True)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many, possibly compressed, log files as one.")
+    parser.add_argument('paths', nargs='+', help="files, directories or glob patterns")
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--timestamp-format', default=timestamp_format)
+    parser.add_argument('--workers', type=int, help="parser processes (default: one per core)")
+    parser.add_argument('--plot', action='store_true', help="plot level and hourly counts")
+    args = parser.parse_args()
+
+    df = load_logs(args.paths, args.pattern, args.timestamp_format, args.workers)
+    if df is not None:
+        print(f"{len(df)} log lines from {df['source'].nunique()} files\n")
+    analyzed_data = analyze_log_data(df)
+    if args.plot:
+        visualize_log_data(analyzed_data)
+
+if __name__ == '__main__':
+    main()
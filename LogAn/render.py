@@ -0,0 +1,105 @@
+"""Headless chart rendering for LogAn.
+
+Charts are drawn from the minute/level rollup (see rollup.py) instead of
+the raw rows, on the non-interactive Agg backend, and written straight to
+PNG/SVG files. Each chart is rendered in its own worker process, so a
+dashboard can be regenerated from cron on a machine without a display.
+
+Usage: python render.py LOG_FILE [--out charts] [--format png,svg] [--workers N]
+"""
+import matplotlib
+matplotlib.use('Agg') #must happen before anything imports pyplot.
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+
+from index import log_pattern, timestamp_format
+from cache import CACHE_DIR
+from rollup import load_rollup, query_rollup, level_counts, hourly_counts
+
+TIMELINE_FREQS = ['1min', '5min', '15min', '1h', '6h', '1D', '7D']
+
+def render_level_chart(counts, path):
+    """Writes the level distribution bar chart."""
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    sns.barplot(x=counts.index.astype(str), y=counts.values, ax=ax)
+    ax.set_title('Log Level Distribution')
+    ax.set_xlabel('level')
+    ax.set_ylabel('count')
+    fig.savefig(path)
+    return path
+
+def render_hourly_chart(counts, path):
+    """Writes the hour-of-day activity line chart."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.lineplot(x=counts.index, y=counts.values, ax=ax)
+    ax.set_title('Hourly Log Activity')
+    ax.set_xlabel('Hour')
+    ax.set_ylabel('Log Count')
+    ax.set_xticks(range(24))
+    ax.grid(True)
+    fig.savefig(path)
+    return path
+
+def render_timeline_chart(table, path):
+    """Writes the per-level counts over time as stacked areas."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    if not table.empty:
+        ax.stackplot(table.index, table.T.values, labels=table.columns.astype(str))
+        ax.legend(loc='upper left')
+    ax.set_title(f'Log Activity per {table.index.freqstr or "bucket"}')
+    ax.set_ylabel('Log Count')
+    ax.grid(True)
+    fig.autofmt_xdate()
+    fig.savefig(path)
+    return path
+
+def timeline_freq(rollup, max_points=500):
+    """Picks the finest bucket size that keeps the timeline under max_points."""
+    minutes = rollup.index.get_level_values('minute')
+    span = minutes.max() - minutes.min()
+    for freq in TIMELINE_FREQS:
+        if span / pd.Timedelta(freq) <= max_points:
+            return freq
+    return TIMELINE_FREQS[-1]
+
+def render_charts(rollup, out_dir, formats=('png',), workers=None, max_points=500):
+    """Renders every chart in every format in parallel; returns the written paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    data = {'levels': (render_level_chart, level_counts(rollup)),
+            'hourly': (render_hourly_chart, hourly_counts(rollup)),
+            'timeline': (render_timeline_chart, query_rollup(rollup, timeline_freq(rollup, max_points)))}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render, counts, os.path.join(out_dir, f'{name}.{fmt}'))
+                   for name, (render, counts) in data.items() for fmt in formats]
+        return [future.result() for future in futures]
+
+def main():
+    parser = argparse.ArgumentParser(description="Render LogAn charts to image files without a display.")
+    parser.add_argument('log_file')
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--timestamp-format', default=timestamp_format)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--out', default='charts', help="output directory")
+    parser.add_argument('--format', default='png', help="comma-separated: png, svg, pdf")
+    parser.add_argument('--workers', type=int, help="render processes (default: one per core)")
+    parser.add_argument('--max-points', type=int, default=500, help="most buckets on the timeline")
+    args = parser.parse_args()
+
+    rollup = load_rollup(args.log_file, args.pattern, args.timestamp_format, args.cache_dir)
+    if rollup.empty:
+        print("No log data to analyze.")
+        return
+    for path in render_charts(rollup, args.out, args.format.split(','), args.workers, args.max_points):
+        print(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Pre-aggregated time-bucket index for LogAn.
+
+The rollup holds one row per (minute, level) with the number of log lines
+in it. Coarser resolutions (5 minutes, hours, days, hour-of-day) are summed
+from it, so queries and plots never touch the raw rows again. The rollup is
+saved next to the parse cache and keyed by the same file fingerprint.
+
+Usage: python rollup.py LOG_FILE [--freq 5min] [--level ERROR] [--last 7D]
+                                 [--since TIME] [--until TIME] [--plot]
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from index import log_pattern, timestamp_format, iter_log_chunks, visualize_log_counts
+from cache import CACHE_DIR, CACHE_EXT, cache_key
+
+def rollup_chunk(df):
+    """Counts the rows of one parsed chunk per (minute, level)."""
+    df = df.dropna(subset=['timestamp'])
+    minutes = df['timestamp'].dt.floor('min').rename('minute')
+    levels = df['level'].astype(str) if 'level' in df.columns else pd.Series('', index=df.index)
+    return df.groupby([minutes, levels.rename('level')], observed=True).size()
+
+def build_rollup(chunks):
+    """Folds parsed chunks into a (minute, level) -> count Series."""
+    rollup = None
+    for chunk in chunks:
+        counts = rollup_chunk(chunk)
+        rollup = counts if rollup is None else rollup.add(counts, fill_value=0).astype('int64')
+    if rollup is None:
+        index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([]), pd.Index([], dtype=str)],
+                                          names=['minute', 'level'])
+        rollup = pd.Series(index=index, dtype='int64')
+    rollup.name = 'count'
+    return rollup.sort_index()
+
+def rollup_path(log_file, log_pattern, timestamp_format=None, cache_dir=CACHE_DIR):
+    """Returns the file a log's rollup is stored in."""
+    return os.path.join(cache_dir, cache_key(log_file, log_pattern, timestamp_format) + '.rollup' + CACHE_EXT)
+
+def load_rollup(log_file, log_pattern, timestamp_format=None, cache_dir=CACHE_DIR):
+    """Returns the rollup of a log file, building and saving it on the first call."""
+    path = rollup_path(log_file, log_pattern, timestamp_format, cache_dir)
+    if os.path.exists(path):
+        frame = pd.read_feather(path) if CACHE_EXT == '.feather' else pd.read_pickle(path)
+        return frame.set_index(['minute', 'level'])['count']
+
+    rollup = build_rollup(iter_log_chunks(log_file, log_pattern, timestamp_format=timestamp_format))
+    os.makedirs(cache_dir, exist_ok=True)
+    frame = rollup.reset_index() #feather can't store a MultiIndex.
+    frame.columns = ['minute', 'level', 'count']
+    tmp_path = path + '.tmp'
+    if CACHE_EXT == '.feather':
+        frame.to_feather(tmp_path)
+    else:
+        frame.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    return rollup
+
+def query_rollup(rollup, freq='1h', level=None, since=None, until=None):
+    """Counts per time bucket of the given frequency, one column per level."""
+    table = rollup.unstack('level', fill_value=0)
+    if level is not None:
+        table = table.reindex(columns=[level], fill_value=0)
+    table = table.loc[since:until]
+    if table.empty:
+        return table
+    return table.resample(freq).sum()
+
+def level_counts(rollup):
+    """Total count per level, largest first."""
+    counts = rollup.groupby(level='level').sum().sort_values(ascending=False, kind='stable')
+    counts.name = 'count'
+    return counts
+
+def hourly_counts(rollup):
+    """Total count per hour of the day, as analyze_log_data prints it."""
+    minutes = rollup.index.get_level_values('minute')
+    counts = rollup.groupby(minutes.hour.rename('hour')).sum()
+    counts.name = 'count'
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a log file through its minute/level rollup.")
+    parser.add_argument('log_file')
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--timestamp-format', default=timestamp_format)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--freq', default='1h', help="bucket size, e.g. 5min, 1h, 1D")
+    parser.add_argument('--level', help="only count this level")
+    parser.add_argument('--since', help="start time, e.g. '2023-10-27 10:00'")
+    parser.add_argument('--until', help="end time")
+    parser.add_argument('--last', help="only the given span before the newest entry, e.g. 7D")
+    parser.add_argument('--plot', action='store_true', help="plot level and hourly counts")
+    args = parser.parse_args()
+
+    rollup = load_rollup(args.log_file, args.pattern, args.timestamp_format, args.cache_dir)
+    if rollup.empty:
+        print("No log data to analyze.")
+        return
+    since, until = args.since, args.until
+    if args.last:
+        until = rollup.index.get_level_values('minute').max()
+        since = until - pd.Timedelta(args.last)
+    print(query_rollup(rollup, args.freq, args.level, since, until))
+    if args.plot:
+        visualize_log_counts(level_counts(rollup), hourly_counts(rollup))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""Indexed full-text search over log files for LogAn.
+
+One parsing pass splits the log into blocks of a fixed number of lines and
+records, per block, its byte range and its earliest and latest timestamp
+(sparse timestamp-to-offset checkpoints), plus an inverted index from
+every lower-cased message token and level to the blocks containing it. A
+query intersects the posting lists of its terms, drops blocks outside the
+time window and then seeks straight to the remaining blocks, so only they
+are read and matched again. The index is stored next to the parse cache
+under the same file fingerprint, so it is rebuilt when the log changes.
+
+Terms are matched as whole words, case-insensitively.
+
+Usage: python search.py LOG_FILE [WORD ...] [--level ERROR] [--since TIME] [--until TIME]
+"""
+import argparse
+import json
+import os
+import re
+from datetime import datetime
+
+from index import log_pattern, timestamp_format
+from cache import CACHE_DIR, cache_key
+
+TOKEN = re.compile(r'\w+')
+
+def tokenize(text):
+    """Lower-cased word tokens of a message or query."""
+    return TOKEN.findall(text.lower())
+
+ISO_FORMATS = {'%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%f'}
+
+def timestamp_parser(timestamp_format=None):
+    """Returns a function that parses a timestamp string to a datetime, or None."""
+    if not timestamp_format or timestamp_format in ISO_FORMATS:
+        parse = datetime.fromisoformat #far faster than strptime for these formats.
+    else:
+        def parse(text):
+            return datetime.strptime(text, timestamp_format)
+
+    def parse_or_none(text):
+        try:
+            return parse(text)
+        except (TypeError, ValueError):
+            return None
+    return parse_or_none
+
+def build_index(log_file, log_pattern, timestamp_format=None, block_lines=1000):
+    """Reads a log file once and returns its block table and inverted token index."""
+    pattern = re.compile(log_pattern)
+    parse_timestamp = timestamp_parser(timestamp_format)
+    blocks, tokens = [], {}
+    block = None
+    with open(log_file, 'rb') as f:
+        offset = 0
+        for number, raw in enumerate(f):
+            if number % block_lines == 0:
+                block = [offset, offset, None, None]
+                blocks.append(block)
+            offset += len(raw)
+            block[1] = offset
+            match = pattern.search(raw.decode().replace('\r\n', '\n'))
+            if not match:
+                continue
+            fields = match.groupdict()
+            block_id = len(blocks) - 1
+            words = set(tokenize(fields.get('message') or ''))
+            if fields.get('level'):
+                words.add('level:' + fields['level'].lower())
+            for word in words:
+                postings = tokens.setdefault(word, [])
+                if not postings or postings[-1] != block_id:
+                    postings.append(block_id)
+            timestamp = parse_timestamp(fields.get('timestamp'))
+            if timestamp:
+                block[2] = min(block[2] or timestamp, timestamp)
+                block[3] = max(block[3] or timestamp, timestamp)
+    for block in blocks:
+        #ISO strings keep time order and fit in JSON.
+        block[2] = block[2] and block[2].isoformat()
+        block[3] = block[3] and block[3].isoformat()
+    return {'block_lines': block_lines, 'blocks': blocks, 'tokens': tokens}
+
+def index_path(log_file, log_pattern, timestamp_format=None, cache_dir=CACHE_DIR):
+    """Returns the file a log's search index is stored in."""
+    return os.path.join(cache_dir, cache_key(log_file, log_pattern, timestamp_format) + '.search.json')
+
+def load_index(log_file, log_pattern, timestamp_format=None, cache_dir=CACHE_DIR):
+    """Returns the search index of a log file, building and saving it on the first call."""
+    path = index_path(log_file, log_pattern, timestamp_format, cache_dir)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    search_index = build_index(log_file, log_pattern, timestamp_format)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(search_index, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+    return search_index
+
+def iso_bound(bound):
+    """A since/until bound (datetime or ISO string) as the isoformat() text the index stores."""
+    if isinstance(bound, str):
+        bound = datetime.fromisoformat(bound) #'2023-10-27 10:00' has to compare like '2023-10-27T10:00:00'.
+    return bound.isoformat() if bound else None
+
+def candidate_blocks(search_index, terms=(), level=None, since=None, until=None):
+    """Block ids that can hold matches: in every term's posting list and overlapping the window."""
+    words = [word for term in terms for word in tokenize(term)]
+    if level:
+        words.append('level:' + level.lower())
+    if words:
+        postings = [set(search_index['tokens'].get(word, ())) for word in words]
+        block_ids = sorted(set.intersection(*postings))
+    else:
+        block_ids = range(len(search_index['blocks']))
+
+    candidates = []
+    for block_id in block_ids:
+        _, _, first, last = search_index['blocks'][block_id]
+        if since and (last is None or last < since):
+            continue
+        if until and (first is None or first > until):
+            continue
+        candidates.append(block_id)
+    return candidates
+
+def search(log_file, log_pattern, terms=(), level=None, since=None, until=None,
+           timestamp_format=None, cache_dir=CACHE_DIR):
+    """Yields the lines whose message contains every term as a word, within the level and time window.
+
+    since/until are datetimes or ISO strings; the window includes both ends.
+    """
+    search_index = load_index(log_file, log_pattern, timestamp_format, cache_dir)
+    since, until = iso_bound(since), iso_bound(until)
+    pattern = re.compile(log_pattern)
+    parse_timestamp = timestamp_parser(timestamp_format)
+    words = {word for term in terms for word in tokenize(term)}
+    with open(log_file, 'rb') as f:
+        for block_id in candidate_blocks(search_index, terms, level, since, until):
+            start, end, _, _ = search_index['blocks'][block_id]
+            f.seek(start)
+            for raw in f.read(end - start).splitlines():
+                line = raw.decode()
+                match = pattern.search(line)
+                if not match:
+                    continue
+                fields = match.groupdict()
+                if level and (fields.get('level') or '').lower() != level.lower():
+                    continue
+                #the same tokens the posting lists hold, so the result doesn't depend on the block.
+                if words and not words <= set(tokenize(fields.get('message') or '')):
+                    continue
+                if since or until:
+                    timestamp = parse_timestamp(fields.get('timestamp'))
+                    timestamp = timestamp and timestamp.isoformat()
+                    if timestamp is None or (since and timestamp < since) or (until and timestamp > until):
+                        continue
+                yield line
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a log file through its on-disk index.")
+    parser.add_argument('log_file')
+    parser.add_argument('terms', nargs='*', help="words the message must contain")
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--timestamp-format', default=timestamp_format)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--level', help="only lines of this level")
+    parser.add_argument('--since', type=datetime.fromisoformat, help="start time, e.g. '2023-10-27 10:00'")
+    parser.add_argument('--until', type=datetime.fromisoformat, help="end time (inclusive)")
+    args = parser.parse_args()
+
+    for line in search(args.log_file, args.pattern, args.terms, args.level, args.since, args.until,
+                       args.timestamp_format, args.cache_dir):
+        print(line)
+
+if __name__ == '__main__':
+    main()
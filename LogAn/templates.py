@@ -0,0 +1,151 @@
+"""Online message-template mining (log signatures) for LogAn.
+
+Messages captured by the message group of log_pattern are tokenized, with
+numbers, hex IDs, UUIDs and IP addresses masked, and grouped into templates
+with a Drain-style fixed-depth prefix tree: messages are first split by
+token count, then by their leading tokens, and finally matched against the
+templates of that leaf by token similarity. Differing tokens turn into <*>
+wildcards. Leaves hold a bounded number of templates, so memory stays
+bounded however many lines are mined.
+
+Usage: python templates.py LOG_FILE [--top 10] [--similarity 0.5] [--depth 2]
+"""
+import argparse
+import re
+from collections import Counter
+
+from index import log_pattern, open_log_file
+
+WILDCARD = '<*>'
+
+MASKS = [
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I), '<UUID>'),
+    (re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b'), '<IP>'),
+    (re.compile(r'\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{6,}\b', re.I), '<HEX>'),
+    (re.compile(r'[-+]?\b\d+(?:\.\d+)?\b'), '<NUM>'),
+]
+
+HAS_DIGIT = re.compile(r'\d')
+
+VARIABLE_TOKEN = re.compile(r'\d|^<')
+
+def mask_message(message):
+    """Replaces variable parts (UUIDs, IPs, hex IDs, numbers) with placeholders."""
+    if not HAS_DIGIT.search(message):
+        return message #every mask needs at least one digit.
+    for pattern, placeholder in MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+class Template:
+    """One message template and how often each level produced it."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.counts = Counter()
+
+    def similarity(self, tokens):
+        """Share of positions where the tokens equal the template (wildcards don't count)."""
+        same = sum(1 for mine, theirs in zip(self.tokens, tokens) if mine == theirs and mine != WILDCARD)
+        return same / len(tokens) if tokens else 1.0
+
+    def merge(self, tokens):
+        """Turns the positions where the tokens differ into wildcards."""
+        self.tokens = [mine if mine == theirs else WILDCARD for mine, theirs in zip(self.tokens, tokens)]
+
+    def __str__(self):
+        return ' '.join(self.tokens)
+
+class TemplateMiner:
+    """Drain-style prefix tree of templates, updated one message at a time."""
+
+    def __init__(self, depth=2, similarity=0.5, max_children=100, max_templates=100, max_cache=100000):
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        self.max_cache = max_cache
+        self.tree = {}
+        self.templates = []
+        self.cache = {} #masked message -> template, skips the tree for repeats.
+
+    def leaf(self, tokens):
+        """Walks (and grows) the tree by token count then leading tokens; returns the leaf list."""
+        node = self.tree.setdefault(len(tokens), {})
+        for token in tokens[:self.depth]:
+            if VARIABLE_TOKEN.search(token):
+                token = WILDCARD #variable-looking tokens shouldn't fan out the tree.
+            if token not in node and len(node) >= self.max_children:
+                token = WILDCARD
+            node = node.setdefault(token, {})
+        return node.setdefault(None, [])
+
+    def add(self, message, level=None):
+        """Adds one message and returns the template it was assigned to."""
+        masked = mask_message(message)
+        best = self.cache.get(masked)
+        if best is not None:
+            best.counts[level] += 1
+            return best
+
+        tokens = masked.split()
+        templates = self.leaf(tokens)
+        scores = [template.similarity(tokens) for template in templates]
+        best = templates[scores.index(max(scores))] if templates else None
+        if best is not None and max(scores) >= self.similarity:
+            best.merge(tokens)
+        elif len(templates) < self.max_templates:
+            best = Template(tokens)
+            templates.append(best)
+            self.templates.append(best)
+        else:
+            #the leaf is full: fold the message into its closest template.
+            best.merge(tokens)
+        best.counts[level] += 1
+        if len(self.cache) >= self.max_cache:
+            self.cache.clear() #keep memory bounded.
+        self.cache[masked] = best
+        return best
+
+    def top(self, n=10, level=None):
+        """Returns the n most frequent (template, count) pairs, optionally for one level."""
+        counts = [(str(template), template.counts[level] if level is not None else sum(template.counts.values()))
+                  for template in self.templates]
+        counts = [(template, count) for template, count in counts if count]
+        return sorted(counts, key=lambda item: item[1], reverse=True)[:n]
+
+    def levels(self):
+        """Every level seen so far."""
+        return sorted({level for template in self.templates for level in template.counts}, key=str)
+
+def mine_log_file(log_file, log_pattern, miner=None):
+    """Feeds the message (and level) of every matching line of a log file to a miner."""
+    miner = miner or TemplateMiner()
+    pattern = re.compile(log_pattern)
+    with open_log_file(log_file) as f:
+        for line in f:
+            match = pattern.search(line)
+            if match:
+                fields = match.groupdict()
+                miner.add(fields.get('message') or '', fields.get('level'))
+    return miner
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the most common message templates in a log file.")
+    parser.add_argument('log_file')
+    parser.add_argument('--pattern', default=log_pattern, help="regex with named groups")
+    parser.add_argument('--top', type=int, default=10, help="templates to show per level")
+    parser.add_argument('--similarity', type=float, default=0.5, help="share of equal tokens to merge")
+    parser.add_argument('--depth', type=int, default=2, help="leading tokens used by the prefix tree")
+    args = parser.parse_args()
+
+    miner = mine_log_file(args.log_file, args.pattern, TemplateMiner(args.depth, args.similarity))
+    print(f"{len(miner.templates)} templates\n")
+    for level in miner.levels():
+        print(f"{level}:")
+        for template, count in miner.top(args.top, level):
+            print(f"  {count:8d}  {template}")
+        print()
+
+if __name__ == '__main__':
+    main()
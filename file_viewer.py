@@ -0,0 +1,233 @@
+import mmap
+import os
+import threading
+import tkinter as tk
+from array import array
+from bisect import bisect_right
+from tkinter import ttk, font
+
+
+class MappedFile:
+    """A read-only file mapped into memory, with a line index built in the background.
+
+    Like LineIndex, the index only stores the number of newlines before
+    every BLOCK-th byte, so it stays small for multi-GB files; the worker
+    counts them with plain reads, which don't add the file to this
+    process's resident memory. Scrolling never waits for the index: it
+    moves from line to line with find/rfind on the mapping. Only
+    jumping to a line number, or showing one, needs it.
+    """
+
+    BLOCK = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = None
+        self.size = 0
+        self.checkpoints = array("q", [0])
+        self.indexer = None
+        self.refresh()
+
+    def refresh(self):
+        """Map any data appended since the last call; returns True if the file changed size.
+
+        A file that shrank (truncated or rotated) is indexed again from the start.
+        """
+        size = os.fstat(self.file.fileno()).st_size
+        if size == self.size:
+            return False
+        if size < self.size:
+            self.file.close()
+            self.file = open(self.path, "rb")
+            self.checkpoints = array("q", [0])
+        old_map = self.map
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.size = size
+        if old_map:
+            old_map.close()
+        if not self.indexer or not self.indexer.is_alive():
+            self.indexer = threading.Thread(target=self.build_index, daemon=True)
+            self.indexer.start()
+        return True
+
+    def build_index(self):
+        """Count newlines block by block up to the last complete block of the file."""
+        with open(self.path, "rb") as file:
+            buffer = bytearray(self.BLOCK)
+            while (len(self.checkpoints) - 1) * self.BLOCK + self.BLOCK <= self.size:
+                checkpoints = self.checkpoints
+                file.seek((len(checkpoints) - 1) * self.BLOCK)
+                if file.readinto(buffer) < self.BLOCK:
+                    return
+                checkpoints.append(checkpoints[-1] + buffer.count(b"\n"))
+
+    def indexed(self):
+        """Share of the file covered by the line index."""
+        return min((len(self.checkpoints) - 1) * self.BLOCK / self.size, 1.0) if self.size else 1.0
+
+    def count_newlines(self, start, end):
+        return self.map[start:end].count(b"\n") if self.map and end > start else 0
+
+    def line_count(self):
+        """Number of lines, or None while the index is still being built."""
+        indexed = (len(self.checkpoints) - 1) * self.BLOCK
+        if indexed + self.BLOCK <= self.size:
+            return None
+        last = 1 if self.size and self.map[self.size - 1:self.size] != b"\n" else 0
+        return self.checkpoints[-1] + self.count_newlines(indexed, self.size) + last
+
+    def line_start(self, line):
+        """Offset of a line (0-based), clamped to the file; None while not yet indexed."""
+        if line <= 0 or not self.map:
+            return 0
+        checkpoints = self.checkpoints
+        block = bisect_right(checkpoints, line - 1) - 1
+        if block == len(checkpoints) - 1 and (block + 1) * self.BLOCK <= self.size:
+            return None  # past the indexed blocks
+        pos = block * self.BLOCK - 1
+        for _ in range(line - checkpoints[block]):
+            pos = self.map.find(b"\n", pos + 1)
+            if pos < 0:
+                return self.line_start_at(self.size)
+        return min(pos + 1, self.size)
+
+    def line_of(self, offset):
+        """Line number (0-based) of an offset, or None while not yet indexed."""
+        block = offset // self.BLOCK
+        if block >= len(self.checkpoints):
+            return None
+        return self.checkpoints[block] + self.count_newlines(block * self.BLOCK, offset)
+
+    def line_start_at(self, offset):
+        """Start of the line that contains offset; the last line for offsets at the end."""
+        if not self.map:
+            return 0
+        if offset >= self.size:
+            offset = self.size - 1
+            if self.map[offset:offset + 1] == b"\n":
+                return self.line_start_at(offset) if offset else 0
+        return self.map.rfind(b"\n", 0, offset) + 1
+
+    def advance(self, offset, lines):
+        """Start of the line the given number of lines below (or above, if negative) offset."""
+        if not self.map:
+            return 0
+        for _ in range(lines):
+            end = self.map.find(b"\n", offset)
+            if end < 0 or end + 1 >= self.size:
+                break
+            offset = end + 1
+        for _ in range(-lines):
+            if offset == 0:
+                break
+            offset = self.map.rfind(b"\n", 0, offset - 1) + 1
+        return offset
+
+    def read_lines(self, offset, lines):
+        """Up to lines lines of text from offset, and the offset after them."""
+        end = offset
+        for _ in range(lines):
+            end = self.map.find(b"\n", end) + 1 if self.map else 0
+            if end <= 0:
+                end = self.size
+                break
+        return self.map[offset:end].decode("utf-8", errors="replace") if self.map else "", end
+
+    def close(self):
+        if self.map:
+            self.map.close()
+        self.file.close()
+
+
+class FileViewer:
+    """Read-only tab showing a MappedFile; the Text widget only holds the lines on screen.
+
+    The scrollbar maps to byte offsets rather than line numbers, so it
+    works before the line index is done. With follow on, the view sticks
+    to the end of the file as it grows.
+    """
+
+    POLL_MS = 500
+
+    def __init__(self, parent, path):
+        self.file = MappedFile(path)
+        self.file_path = path
+        self.top = 0  # offset of the first line on screen
+        self.bottom = 0  # offset after the last line on screen
+        self.follow = tk.BooleanVar(value=False)
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text_area = tk.Text(parent, wrap="none", state=tk.DISABLED)
+        self.text_area.pack(expand=True, fill="both")
+        self.text_area.bind("<Configure>", lambda event: self.render())
+        self.text_area.bind("<ButtonPress-1>", lambda event: self.text_area.focus_set(), add="+")
+        self.text_area.bind("<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.text_area.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.text_area.bind("<Button-5>", lambda event: self.scroll(3))
+        for key, lines in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "page-up"), ("<Next>", "page")):
+            self.text_area.bind(key, lambda event, lines=lines: self.scroll(lines) or "break")
+        self.text_area.bind("<Control-Home>", lambda event: self.goto_offset(0) or "break")
+        self.text_area.bind("<Control-End>", lambda event: self.goto_end() or "break")
+        self.poll_after = self.text_area.after(self.POLL_MS, self.poll)
+
+    def visible_lines(self):
+        linespace = font.Font(font=self.text_area.cget("font")).metrics("linespace")
+        return max(self.text_area.winfo_height() // linespace, 1) + 1
+
+    def render(self):
+        """Put the lines from self.top that fit in the widget into it."""
+        text, self.bottom = self.file.read_lines(self.top, self.visible_lines())
+        self.text_area.config(state=tk.NORMAL)
+        self.text_area.delete("1.0", tk.END)
+        self.text_area.insert("1.0", text)
+        self.text_area.config(state=tk.DISABLED)
+        size = self.file.size or 1
+        self.scrollbar.set(self.top / size, self.bottom / size)
+
+    def scroll(self, lines):
+        if lines in ("page", "page-up"):
+            lines = (self.visible_lines() - 2) * (1 if lines == "page" else -1)
+        self.goto_offset(self.file.advance(self.top, lines))
+
+    def goto_offset(self, offset):
+        self.top = self.file.line_start_at(offset)
+        self.render()
+
+    def goto_end(self):
+        """Show the last screenful of the file."""
+        self.goto_offset(self.file.advance(self.file.line_start_at(self.file.size), 2 - self.visible_lines()))
+
+    def goto_line(self, line):
+        """Show a line (0-based) at the top; returns False while the line index isn't ready."""
+        offset = self.file.line_start(line)
+        if offset is None:
+            return False
+        self.goto_offset(offset)
+        return True
+
+    def current_line(self):
+        """Line number (0-based) at the top of the view, or None if not indexed yet."""
+        return self.file.line_of(self.top)
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.goto_offset(int(float(args[1]) * self.file.size))
+        elif args[2] == "pages":
+            self.scroll("page" if int(args[1]) > 0 else "page-up")
+        else:
+            self.scroll(int(args[1]))
+
+    def poll(self):
+        """Pick up data appended to the file, following it if asked to."""
+        if self.file.refresh() or self.follow.get():
+            if self.follow.get():
+                self.goto_end()
+            else:
+                self.render()
+        self.poll_after = self.text_area.after(self.POLL_MS, self.poll)
+
+    def close(self):
+        self.text_area.after_cancel(self.poll_after)
+        self.file.close()
@@ -0,0 +1,67 @@
+import re
+
+from piece_table import PieceTable
+
+
+class Finder:
+    """A compiled find query, run over a PieceTable a block at a time.
+
+    Plain queries are escaped and compiled like regexes, so both share one
+    code path. The document is scanned in blocks of about BLOCK characters
+    cut at line ends, so nothing the size of the document is ever copied;
+    ^ and $ match at every line, and a match can't span two blocks. Empty
+    matches are skipped when finding, as they can't be selected.
+    """
+
+    BLOCK = 1 << 20
+
+    def __init__(self, query, regex=False, ignore_case=False):
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        self.regex = regex
+        self.pattern = re.compile(query if regex else re.escape(query), flags)  # raises re.error
+
+    def blocks(self, doc, start=0, end=None):
+        """Yield (offset, text) blocks of doc[start:end] that end at a line end."""
+        end = len(doc) if end is None else end
+        while start < end:
+            text = doc.get(start, min(start + self.BLOCK, end))
+            cut = text.rfind("\n")
+            if start + len(text) < end and cut >= 0:
+                text = text[:cut + 1]
+            yield start, text
+            start += len(text)
+
+    def iter_matches(self, doc, start=0, end=None):
+        """Yield (start, end, match) for every non-empty match in doc[start:end]."""
+        for offset, text in self.blocks(doc, start, end):
+            for match in self.pattern.finditer(text):
+                if match.end() > match.start():
+                    yield offset + match.start(), offset + match.end(), match
+
+    def find_next(self, doc, offset, backwards=False):
+        """(start, end, match) of the first match after (or last before) offset, wrapping around."""
+        if backwards:
+            found = None
+            for found in self.iter_matches(doc, 0, offset):
+                pass
+            if found is None:
+                for found in self.iter_matches(doc, offset):
+                    pass
+            return found
+        return next(self.iter_matches(doc, offset), None) or next(self.iter_matches(doc, 0, offset), None)
+
+    def expand(self, match, replacement):
+        """The text a match is replaced with: regex replacements may use \\1 and \\g<name>."""
+        return match.expand(replacement) if self.regex else replacement
+
+    def replace_all(self, doc, replacement):
+        """Return (new document, number of replacements); doc itself is left unchanged."""
+        if not self.regex:
+            replacement = replacement.replace("\\", "\\\\")  # make re.subn take it literally
+        total = 0
+        parts = []
+        for _, text in self.blocks(doc):
+            text, count = self.pattern.subn(replacement, text)
+            parts.append(text)
+            total += count
+        return PieceTable.from_chunks(parts), total
@@ -1,5 +1,353 @@
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import uuid
 import tkinter as tk
-from tkinter import ttk, filedialog, scrolledtext, font, simpledialog, messagebox
+from tkinter import ttk, filedialog, font, simpledialog, messagebox
+
+from file_viewer import FileViewer
+from finder import Finder
+from piece_table import PieceTable
+
+# Number of document lines kept in a Text widget at once
+WINDOW_LINES = 2000
+
+# Characters read or written per step by background file operations
+CHUNK_SIZE = 1 << 22
+
+# Open tabs are saved here on exit, unsaved content as one file per tab next to it
+SESSION_DIR = os.path.join(os.path.expanduser("~"), ".text_editor")
+SESSION_FILE = os.path.join(SESSION_DIR, "session.json")
+
+def read_chunks(file_path, cancelled):
+    """Read a text file in chunks, yielding (progress, chunk) until done or cancelled."""
+    size = os.path.getsize(file_path) or 1
+    with open(file_path, "r") as file:
+        while not cancelled.is_set():
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield file.buffer.tell() / size, chunk
+
+def write_chunks(doc, file_path, cancelled):
+    """Write a document to a temp file next to file_path, then rename it over file_path.
+
+    Readers of file_path see either the old or the new content, never a half
+    written file; a cancelled or failed save leaves the old file untouched.
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            written = 0
+            for chunk in doc.chunks(size=CHUNK_SIZE):
+                if cancelled.is_set():
+                    break
+                file.write(chunk)
+                written += len(chunk)
+                yield written / max(len(doc), 1), None
+            file.flush()
+            os.fsync(file.fileno())
+        if cancelled.is_set():
+            os.remove(temp_path)
+            return
+        # Keep the permissions of the file being replaced (mkstemp creates 0600 files)
+        os.chmod(temp_path, os.stat(file_path).st_mode & 0o7777 if os.path.exists(file_path) else 0o644)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+class BackgroundTask:
+    """Runs a chunked file operation on a worker thread.
+
+    work(cancelled) returns an iterable of (progress, payload) pairs; they are
+    handed to the Tk thread through a bounded queue, which the editor drains
+    from root.after callbacks, so the main loop never blocks on I/O and the
+    reader never gets far ahead of the widget.
+    """
+
+    def __init__(self, work):
+        self.cancelled = threading.Event()
+        self.queue = queue.Queue(maxsize=8)
+        self.thread = threading.Thread(target=self.run, args=(work,), daemon=True)
+        self.thread.start()
+
+    def run(self, work):
+        try:
+            for progress, payload in work(self.cancelled):
+                self.queue.put(("item", progress, payload))
+            self.queue.put(("cancelled" if self.cancelled.is_set() else "done", 1.0, None))
+        except Exception as error:
+            self.queue.put(("error", 1.0, error))
+
+    def cancel(self):
+        self.cancelled.set()
+
+class DocumentView:
+    """Shows a window of a PieceTable document in a Text widget.
+
+    Only WINDOW_LINES lines around the visible region live in the widget;
+    scrolling near either edge of the window slides it along the document,
+    and edits made in the widget are written back to the document first.
+    The widget's own undo history covers the edits since the window was
+    loaded; when it slides, the document from before those edits goes on a
+    document-level stack (piece tables share their buffers, so that's
+    cheap), and undo steps back through it once the widget has no more.
+    """
+
+    def __init__(self, parent):
+        self.doc = PieceTable()
+        self.file_path = None
+        self.first_line = 0  # document line shown on widget line 1
+        self.window_start = self.window_end = 0  # document offsets of the widget content
+        self.recenter_pending = False
+        self.finder = None  # highlighted query, see highlight_visible
+        self.highlight_pending = False
+        self.base = self.doc.snapshot()  # the document as the widget's undo history starts from it
+        self.doc_undo = []  # earlier documents: before replaced windows' edits and whole-document replaces
+        self.doc_redo = []
+        self.saved_pieces = self.doc.pieces  # edits replace the piece list, so this tells if there are any
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text_area = tk.Text(parent, undo=True, wrap="word", yscrollcommand=self.on_widget_scroll)
+        self.text_area.pack(expand=True, fill="both")
+        self.text_area.tag_config("match", background="yellow", foreground="black")
+        self.text_area.tag_raise(tk.SEL, "match")
+        self.text_area.bind("<<Undo>>", self.on_undo)
+        self.text_area.bind("<<Redo>>", self.on_redo)
+
+    def flush(self):
+        """Write edits made in the widget back to the document."""
+        if self.text_area.edit_modified():
+            text = self.text_area.get("1.0", "end-1c")
+            # edits undone in the widget leave it modified; don't record those as a change
+            if text != self.doc.get(self.window_start, self.window_end):
+                self.doc.replace(self.window_start, self.window_end, text)
+                self.window_end = self.window_start + len(text)
+            self.text_area.edit_modified(False)
+
+    def checkpoint(self):
+        """Move the widget's edits, about to leave its undo history, onto the document's."""
+        self.flush()
+        if self.doc.pieces is not self.base.pieces:
+            self.doc_undo.append(self.base)
+            self.doc_redo.clear()
+            self.base = self.doc.snapshot()
+
+    def load_window(self, first_line):
+        """Fill the widget with WINDOW_LINES document lines starting near first_line."""
+        self.checkpoint()
+        first_line = max(0, min(first_line, self.doc.line_count() - WINDOW_LINES))
+        self.first_line = first_line
+        self.window_start = self.doc.line_start(first_line)
+        self.window_end = self.doc.line_start(first_line + WINDOW_LINES)
+        state = self.text_area.cget("state")
+        self.text_area.config(state=tk.NORMAL)  # a disabled widget ignores inserts
+        self.text_area.delete("1.0", tk.END)
+        self.text_area.insert("1.0", self.doc.get(self.window_start, self.window_end))
+        self.text_area.config(state=state)
+        self.text_area.edit_reset()
+        self.text_area.edit_modified(False)
+
+    def append(self, text):
+        """Add text at the end of the document, showing it if the window isn't full yet."""
+        self.doc.insert(len(self.doc), text)
+        self.base = self.doc.snapshot()  # loading isn't an edit to undo
+        if self.loaded_lines() <= WINDOW_LINES:
+            self.load_window(self.first_line)
+        else:
+            self.on_widget_scroll(*self.text_area.yview())
+
+    def set_text(self, text):
+        """Replace the whole document."""
+        self.doc = PieceTable(text)
+        self.base = self.doc.snapshot()
+        self.doc_undo.clear()
+        self.doc_redo.clear()
+        self.text_area.edit_modified(False)  # the old window belongs to the old document
+        self.load_window(0)
+        self.text_area.mark_set(tk.INSERT, "1.0")
+
+    def mark_saved(self, doc=None):
+        """Remember doc (default: the current document) as the content on disk."""
+        self.saved_pieces = (doc or self.doc).pieces
+
+    def is_modified(self):
+        """Whether the document differs from what was last loaded or saved."""
+        self.flush()
+        return self.doc.pieces is not self.saved_pieces
+
+    def get_text(self):
+        """The whole document as one string."""
+        self.flush()
+        return self.doc.get()
+
+    def loaded_lines(self):
+        return int(self.text_area.index("end-1c").split(".")[0])
+
+    def on_widget_scroll(self, first, last):
+        """Map the widget's scroll position to the document and slide the window at its edges."""
+        first, last = float(first), float(last)
+        total = max(self.doc.line_count(), 1)
+        loaded = self.loaded_lines()
+        self.scrollbar.set((self.first_line + first * loaded) / total, (self.first_line + last * loaded) / total)
+        at_bottom = last >= 1.0 and self.window_end < len(self.doc)
+        at_top = first <= 0.0 and self.first_line > 0
+        if (at_bottom or at_top) and not self.recenter_pending:
+            self.recenter_pending = True
+            self.text_area.after_idle(self.recenter)
+        if self.finder and not self.highlight_pending:
+            self.highlight_pending = True
+            self.text_area.after_idle(self.highlight_visible)
+
+    def recenter(self):
+        """Slide the window so the visible lines sit in its middle, keeping view and cursor."""
+        self.recenter_pending = False
+        top = self.first_line + int(self.text_area.index("@0,0").split(".")[0]) - 1
+        line, column = self.text_area.index(tk.INSERT).split(".")
+        cursor_line = self.first_line + int(line) - 1
+        self.load_window(top - WINDOW_LINES // 2)
+        if self.first_line <= cursor_line < self.first_line + self.loaded_lines():
+            self.text_area.mark_set(tk.INSERT, f"{cursor_line - self.first_line + 1}.{column}")
+        self.text_area.yview(f"{top - self.first_line + 1}.0")
+
+    def scroll_to_line(self, line):
+        """Show a document line (0-based) at the top of the widget."""
+        line = max(0, min(line, self.doc.line_count() - 1))
+        if not self.first_line <= line < self.first_line + self.loaded_lines():
+            self.load_window(line - WINDOW_LINES // 2)
+        self.text_area.yview(f"{line - self.first_line + 1}.0")
+
+    def on_scrollbar(self, *args):
+        """Scrollbar drags jump through the whole document, not just the loaded window."""
+        if args[0] == "moveto":
+            self.scroll_to_line(int(float(args[1]) * self.doc.line_count()))
+        else:
+            self.text_area.yview(*args)
+
+    def cursor_position(self):
+        """Document line (1-based) and column of the insert cursor."""
+        line, column = self.text_area.index(tk.INSERT).split(".")
+        return self.first_line + int(line), int(column)
+
+    def set_cursor(self, line, column=0, top=None):
+        """Put the insert cursor at a document line (0-based) and column, showing line top."""
+        self.scroll_to_line(line if top is None else top)
+        if not self.first_line <= line < self.first_line + self.loaded_lines():
+            self.scroll_to_line(line)
+        self.text_area.mark_set(tk.INSERT, f"{line - self.first_line + 1}.{column}")
+
+    def offset_of(self, index):
+        """Document offset of a widget index."""
+        self.flush()
+        return self.window_start + (self.text_area.count("1.0", index, "chars") or (0,))[0]
+
+    def index_of(self, offset):
+        """Widget index of a document offset inside the loaded window."""
+        return f"1.0 + {offset - self.window_start} chars"
+
+    def select(self, start, end):
+        """Select the document range [start, end), loading and scrolling to it."""
+        if not self.window_start <= start <= end <= self.window_end:
+            self.scroll_to_line(self.doc.line_of(start))
+        self.text_area.tag_remove(tk.SEL, "1.0", tk.END)
+        self.text_area.tag_add(tk.SEL, self.index_of(start), self.index_of(end))
+        self.text_area.mark_set(tk.INSERT, self.index_of(end))
+        self.text_area.see(tk.INSERT)
+
+    def highlight(self, finder):
+        """Highlight the matches of finder (None to clear) while they're on screen."""
+        self.finder = finder
+        self.highlight_visible()
+
+    def highlight_visible(self):
+        """Tag the matches in the visible lines only, so the cost doesn't grow with the document."""
+        self.highlight_pending = False
+        self.text_area.tag_remove("match", "1.0", tk.END)
+        if not self.finder:
+            return
+        top = int(self.text_area.index("@0,0").split(".")[0])
+        bottom = int(self.text_area.index(f"@0,{self.text_area.winfo_height()}").split(".")[0])
+        text = self.text_area.get(f"{top}.0", f"{bottom}.0 lineend")
+        line, line_start = top, 0
+        for match in self.finder.pattern.finditer(text):
+            if match.end() == match.start():
+                continue
+            line += text.count("\n", line_start, match.start())
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            self.text_area.tag_add("match", f"{line}.{match.start() - line_start}",
+                                   f"{top}.0 + {match.end()} chars")
+
+    def replace_all(self, finder, replacement):
+        """Replace every match as one undo step; returns the number of replacements."""
+        self.flush()
+        if self.window_start == 0 and self.window_end == len(self.doc):
+            # The whole document is in the widget: edit it there, so Tk's undo covers it
+            text = self.text_area.get("1.0", "end-1c")
+            edits, line, line_start = [], 1, 0
+            for match in finder.pattern.finditer(text):
+                line += text.count("\n", line_start, match.start())
+                line_start = text.rfind("\n", 0, match.start()) + 1
+                edits.append((f"{line}.{match.start() - line_start}", f"1.0 + {match.end()} chars",
+                              finder.expand(match, replacement)))
+            self.text_area.config(autoseparators=False)
+            self.text_area.edit_separator()
+            for start, end, new_text in reversed(edits):  # back to front keeps earlier indices valid
+                self.text_area.delete(start, end)
+                self.text_area.insert(start, new_text)
+            self.text_area.edit_separator()
+            self.text_area.config(autoseparators=True)
+            self.highlight_visible()
+            return len(edits)
+        # Otherwise build a new document a block at a time and keep the old one to undo to
+        doc, count = finder.replace_all(self.doc, replacement)
+        if count:
+            top = self.first_line + int(self.text_area.index("@0,0").split(".")[0]) - 1
+            self.checkpoint()
+            self.doc_undo.append(self.base)
+            self.doc_redo.clear()
+            self.doc, self.base = doc, doc.snapshot()
+            self.load_window(self.first_line)
+            self.text_area.yview(f"{top - self.first_line + 1}.0")
+        return count
+
+    def undo(self):
+        """Undo the last edit in the widget, or else go back one document on the undo stack."""
+        try:
+            self.text_area.edit_undo()
+        except tk.TclError:  # nothing left to undo in the widget
+            if self.doc_undo:
+                self.flush()
+                self.doc_redo.append(self.doc)
+                self.doc = self.doc_undo.pop()
+                self.base = self.doc.snapshot()
+                self.load_window(self.first_line)
+
+    def redo(self):
+        """Redo in the widget, or else the last document-level undo if nothing was edited since."""
+        try:
+            self.text_area.edit_redo()
+        except tk.TclError:
+            self.flush()
+            if self.doc_redo and self.doc.pieces is self.base.pieces:
+                self.doc_undo.append(self.doc)
+                self.doc = self.doc_redo.pop()
+                self.base = self.doc.snapshot()
+                self.load_window(self.first_line)
+
+    def on_undo(self, event):
+        self.undo()
+        return "break"
+
+    def on_redo(self, event):
+        self.redo()
+        return "break"
 
 class TextEditor:
     def __init__(self, root):
@@ -11,11 +359,13 @@ class TextEditor:
         self.tab_control = ttk.Notebook(self.root)
         self.tab_control.pack(expand=1, fill="both")
 
-        # Dictionary to store text areas
+        # Dictionary to store text areas, and the document views behind them
         self.text_areas = {}
-
-        # Create the first tab
-        self.new_tab()
+        self.views = {}
+        # Read-only file viewers, by tab
+        self.viewers = {}
+        # Restored tabs that haven't been selected yet: tab -> session entry, no widgets
+        self.pending_tabs = {}
 
         # Menu Bar
         self.menu_bar = tk.Menu(self.root)
@@ -26,6 +376,7 @@ class TextEditor:
         file_menu.add_command(label="New Tab", accelerator="Ctrl+T", command=self.new_tab)
         file_menu.add_command(label="New File", accelerator="Ctrl+N", command=self.new_file)
         file_menu.add_command(label="Open", accelerator="Ctrl+O", command=self.open_file)
+        file_menu.add_command(label="Open Read-Only Viewer", command=self.open_viewer)
         file_menu.add_command(label="Save", accelerator="Ctrl+S", command=self.save_file)
         file_menu.add_command(label="Save As", accelerator="Ctrl+Shift+S", command=self.save_as)
         file_menu.add_separator()
@@ -51,6 +402,9 @@ class TextEditor:
         view_menu = tk.Menu(self.menu_bar, tearoff=0)
         view_menu.add_checkbutton(label="Status Bar", command=self.toggle_status_bar)
         view_menu.add_command(label="Toggle Dark Mode", command=self.toggle_dark_mode)
+        view_menu.add_separator()
+        view_menu.add_command(label="Go to Line", command=self.goto_line)
+        view_menu.add_command(label="Toggle Follow", command=self.toggle_follow)
         self.menu_bar.add_cascade(label="View", menu=view_menu)
 
         # Format Menu
@@ -67,68 +421,389 @@ class TextEditor:
         self.status_bar = tk.Label(self.root, text="Line 1, Column 1", bd=1, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
+        # Find bar: searches as you type, shown by Find & Replace
+        self.find_var = tk.StringVar()
+        self.replace_var = tk.StringVar()
+        self.regex_var = tk.BooleanVar()
+        self.case_var = tk.BooleanVar()
+        self.finder = None
+        self.find_open = False
+        self.find_after = None
+        self.find_bar = tk.Frame(self.root)
+        tk.Label(self.find_bar, text="Find:").pack(side=tk.LEFT)
+        self.find_entry = tk.Entry(self.find_bar, textvariable=self.find_var)
+        self.find_entry.pack(side=tk.LEFT)
+        tk.Label(self.find_bar, text="Replace:").pack(side=tk.LEFT)
+        tk.Entry(self.find_bar, textvariable=self.replace_var).pack(side=tk.LEFT)
+        tk.Checkbutton(self.find_bar, text="Regex", variable=self.regex_var, command=self.update_find).pack(side=tk.LEFT)
+        tk.Checkbutton(self.find_bar, text="Match case", variable=self.case_var,
+                       command=self.update_find).pack(side=tk.LEFT)
+        tk.Button(self.find_bar, text="Prev", command=lambda: self.find_next(backwards=True)).pack(side=tk.LEFT)
+        tk.Button(self.find_bar, text="Next", command=self.find_next).pack(side=tk.LEFT)
+        tk.Button(self.find_bar, text="Replace", command=self.replace_one).pack(side=tk.LEFT)
+        tk.Button(self.find_bar, text="Replace All", command=self.replace_all).pack(side=tk.LEFT)
+        tk.Button(self.find_bar, text="Close", command=self.close_find).pack(side=tk.LEFT)
+        self.find_message = tk.Label(self.find_bar, anchor=tk.W)
+        self.find_message.pack(side=tk.LEFT, fill=tk.X)
+        self.find_var.trace_add("write", lambda *args: self.schedule_find())
+        self.find_entry.bind("<Return>", lambda event: self.find_next())
+        self.find_entry.bind("<Shift-Return>", lambda event: self.find_next(backwards=True))
+        self.find_entry.bind("<Escape>", lambda event: self.close_find())
+        self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # Progress of background file operations, shown only while one runs
+        self.task = None
+        self.task_bar = tk.Frame(self.root)
+        self.task_label = tk.Label(self.task_bar, anchor=tk.W)
+        self.task_label.pack(side=tk.LEFT)
+        tk.Button(self.task_bar, text="Cancel", command=self.cancel_task).pack(side=tk.RIGHT)
+        self.task_progress = ttk.Progressbar(self.task_bar, maximum=1.0)
+        self.task_progress.pack(side=tk.RIGHT, expand=True, fill=tk.X, padx=5)
+        self.root.bind("<Escape>", lambda event: self.cancel_task())
+
+        # Reopen the last session's tabs, or start with an empty one
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_editor)
+        if not self.restore_session():
+            self.new_tab()
+
     def new_tab(self):
         """Create a new tab with a text area."""
         tab = tk.Frame(self.tab_control)
-        text_area = scrolledtext.ScrolledText(tab, undo=True, wrap="word")
-        text_area.pack(expand=True, fill="both")
+        self.create_view(tab)
+
+        # Add tab and switch to it
+        self.tab_control.add(tab, text="Untitled")
+        self.tab_control.select(tab)
+
+    def create_view(self, tab):
+        """Create the text area of a tab."""
+        view = DocumentView(tab)
+        text_area = view.text_area
+        if self.dark_mode:
+            text_area.config(background="black", foreground="white", insertbackground="white")
 
         # Store the text area with its tab
         self.text_areas[tab] = text_area
+        self.views[tab] = view
 
         # Bind key and mouse events to update the status bar
         text_area.bind("<KeyRelease>", self.update_status)
         text_area.bind("<ButtonRelease-1>", self.update_status)
+        return view
+
+    def on_tab_changed(self, event=None):
+        """Build a restored tab when it is first selected, then refresh the find highlights."""
+        selected = self.tab_control.select()
+        if selected and self.root.nametowidget(selected) in self.pending_tabs:
+            self.activate_tab(self.root.nametowidget(selected))
+        self.update_find()
+
+    def activate_tab(self, tab):
+        """Load the content of a restored tab: its unsaved snapshot, or else its file."""
+        if tab not in self.pending_tabs:
+            return
+        if self.task:
+            # Only one file operation runs at a time; try again when it's done
+            self.root.after(100, self.activate_tab, tab)
+            return
+        entry = self.pending_tabs.pop(tab)
+        if entry.get("viewer"):
+            self.create_viewer(tab, entry["viewer"], entry.get("top", 0), entry.get("follow", False))
+            return
+        view = self.create_view(tab)
+        source = entry.get("snapshot") and os.path.join(SESSION_DIR, entry["snapshot"])
+        source = source or entry.get("file_path")
+
+        def on_loaded(view):
+            view.file_path = entry.get("file_path")
+            self.tab_control.tab(tab, text=entry.get("title", "Untitled"))
+            if entry.get("snapshot"):
+                view.mark_saved(PieceTable())  # the content isn't on disk under file_path
+            view.set_cursor(entry.get("line", 0), entry.get("column", 0), entry.get("top"))
+            self.update_status()
+
+        if source:
+            self.load_file(source, tab, on_loaded)
+        else:
+            on_loaded(view)
 
-        # Add tab and switch to it
-        self.tab_control.add(tab, text="Untitled")
-        self.tab_control.select(tab)
+    def get_current_view(self):
+        """Return the document view of the selected tab."""
+        selected = self.tab_control.select()
+        if selected:
+            return self.views.get(self.root.nametowidget(selected))
+        return None
+
+    def get_current_text_area(self):
+        """Return the text widget of the selected tab."""
+        view = self.get_current_view()
+        return view.text_area if view else None
 
     def new_file(self):
         """Clear the text in the current tab."""
-        text_area = self.get_current_text_area()
-        if text_area:
-            text_area.delete(1.0, tk.END)
+        view = self.get_current_view()
+        if view:
+            view.set_text("")
+            view.mark_saved()
+            view.file_path = None
 
     def open_file(self):
         """Open a file in the current tab."""
         file_path = filedialog.askopenfilename()
         if file_path:
-            with open(file_path, "r") as file:
-                content = file.read()
-            text_area = self.get_current_text_area()
-            if text_area:
-                text_area.delete(1.0, tk.END)
-                text_area.insert(tk.END, content)
+            self.load_file(file_path)
+
+    def open_viewer(self):
+        """Open a file read-only in a new tab, however large it is."""
+        file_path = filedialog.askopenfilename()
+        if file_path:
+            tab = tk.Frame(self.tab_control)
+            self.tab_control.add(tab, text=os.path.basename(file_path) + " (read-only)")
+            if self.create_viewer(tab, file_path):
+                self.tab_control.select(tab)
+            else:
+                self.tab_control.forget(tab)
+                tab.destroy()
+
+    def create_viewer(self, tab, file_path, top_line=0, follow=False):
+        """Show a file in a FileViewer inside tab; returns None if it can't be opened."""
+        try:
+            viewer = FileViewer(tab, file_path)
+        except OSError as error:
+            messagebox.showerror("Open", f"Could not open {file_path}:\n{error}")
+            return None
+        if self.dark_mode:
+            viewer.text_area.config(background="black", foreground="white", insertbackground="white")
+        viewer.follow.set(follow)
+        if top_line:
+            # The line index is built in the background; wait for it to reach the line
+            def restore_top():
+                if not viewer.goto_line(top_line):
+                    viewer.text_area.after(100, restore_top)
+            restore_top()
+        viewer.text_area.bind("<KeyRelease>", self.update_status, add="+")
+        viewer.text_area.bind("<ButtonRelease-1>", self.update_status, add="+")
+        self.text_areas[tab] = viewer.text_area
+        self.viewers[tab] = viewer
+        return viewer
+
+    def get_current_viewer(self):
+        """Return the file viewer of the selected tab, if it is a viewer tab."""
+        selected = self.tab_control.select()
+        if selected:
+            return self.viewers.get(self.root.nametowidget(selected))
+        return None
+
+    def goto_line(self):
+        """Ask for a line number and show it, in an editor or a viewer tab."""
+        line = simpledialog.askinteger("Go to Line", "Line number:", minvalue=1)
+        if not line:
+            return
+        viewer = self.get_current_viewer()
+        if viewer:
+            if not viewer.goto_line(line - 1):
+                messagebox.showinfo("Go to Line", f"Still indexing lines ({viewer.file.indexed():.0%}), "
+                                                  "try again in a moment.")
+        else:
+            view = self.get_current_view()
+            if view:
+                view.set_cursor(line - 1)
+        self.update_status()
+
+    def toggle_follow(self):
+        """Keep the current viewer scrolled to the end of its file as it grows."""
+        viewer = self.get_current_viewer()
+        if viewer:
+            viewer.follow.set(not viewer.follow.get())
+            if viewer.follow.get():
+                viewer.goto_end()
+            self.update_status()
+
+    def load_file(self, file_path, tab=None, on_loaded=None):
+        """Read a file on a worker thread, streaming it into a tab as it arrives."""
+        tab = tab or self.root.nametowidget(self.tab_control.select())
+        view = self.views.get(tab)
+        if not view:
+            return  # a restored tab that is still waiting to be loaded
+        if self.task:
+            messagebox.showinfo("Busy", "Wait for the current file operation to finish or cancel it.")
+            return
+        old_doc, old_path = view.doc, view.file_path
+        view.set_text("")
+        view.text_area.config(state=tk.DISABLED)
+
+        def on_done(status, error):
+            view.text_area.config(state=tk.NORMAL)
+            if status == "done":
+                view.file_path = file_path
+                view.mark_saved()
+                self.tab_control.tab(tab, text=os.path.basename(file_path))
+                if on_loaded:
+                    on_loaded(view)
+            else:
+                # Cancelled or failed: put the previous document back
+                view.doc, view.file_path = old_doc, old_path
+                view.base = old_doc.snapshot()  # not an edit to undo either
+                view.load_window(0)
+            if error:
+                messagebox.showerror("Open", f"Could not open {file_path}:\n{error}")
+
+        self.start_task(f"Opening {os.path.basename(file_path)}", lambda cancelled: read_chunks(file_path, cancelled),
+                        view.append, on_done)
 
     def save_file(self):
         """Save the content of the current tab."""
         file_path = filedialog.asksaveasfilename()
         if file_path:
-            text_area = self.get_current_text_area()
-            if text_area:
-                with open(file_path, "w") as file:
-                    file.write(text_area.get(1.0, tk.END))
+            self.write_file(file_path)
+
+    def write_file(self, file_path, tab=None):
+        """Save a tab atomically on a worker thread; editing can go on meanwhile."""
+        tab = tab or self.root.nametowidget(self.tab_control.select())
+        view = self.views.get(tab)
+        if not view:
+            return  # a restored tab that is still waiting to be loaded
+        if self.task:
+            messagebox.showinfo("Busy", "Wait for the current file operation to finish or cancel it.")
+            return
+        view.flush()
+        # Pieces are immutable, so the worker can write this copy while the tab keeps changing
+        snapshot = view.doc.snapshot()
+
+        def on_done(status, error):
+            if status == "done":
+                view.file_path = file_path
+                view.mark_saved(snapshot)
+                self.tab_control.tab(tab, text=os.path.basename(file_path))
+            if error:
+                messagebox.showerror("Save", f"Could not save {file_path}:\n{error}")
+
+        self.start_task(f"Saving {os.path.basename(file_path)}",
+                        lambda cancelled: write_chunks(snapshot, file_path, cancelled), None, on_done)
+
+    def start_task(self, label, work, on_item, on_done):
+        """Run work on a background thread, showing progress until on_done(status, error)."""
+        self.task = BackgroundTask(work)
+        self.task_label.config(text=label)
+        self.task_progress["value"] = 0
+        self.pack_bar(self.task_bar)
+        self.root.after(30, self.poll_task, self.task, on_item, on_done)
+
+    def poll_task(self, task, on_item, on_done):
+        """Drain the task's queue on the Tk thread, then check again shortly."""
+        try:
+            for _ in range(16):  # bounded, so input events still get handled between batches
+                status, progress, payload = task.queue.get_nowait()
+                self.task_progress["value"] = progress
+                if status == "item":
+                    if on_item:
+                        on_item(payload)
+                    continue
+                self.task = None
+                self.task_bar.pack_forget()
+                on_done(status, payload if status == "error" else None)
+                return
+        except queue.Empty:
+            pass
+        self.root.after(30, self.poll_task, task, on_item, on_done)
+
+    def cancel_task(self):
+        """Cancel the running file operation, if any."""
+        if self.task:
+            self.task.cancel()
 
     def save_as(self):
         """Save as a new file."""
         self.save_file()
 
     def exit_editor(self):
-        """Exit the application."""
+        """Save the session and exit the application."""
+        if self.task:
+            if not self.task.cancelled.is_set() and \
+                    not messagebox.askyesno("Exit", "A file operation is still running. Cancel it and exit?"):
+                return
+            # Let a cancelled load put the tab's previous document back before it is saved
+            self.task.cancel()
+            self.root.after(100, self.exit_editor)
+            return
+        try:
+            self.save_session()
+        except OSError as error:
+            if not messagebox.askyesno("Exit", f"Could not save the session:\n{error}\nExit anyway?"):
+                return
         self.root.quit()
 
+    def save_session(self):
+        """Write every tab's file path, cursor and unsaved content to SESSION_FILE."""
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        tabs = []
+        for tab_name in self.tab_control.tabs():
+            tab = self.root.nametowidget(tab_name)
+            if tab in self.pending_tabs:
+                tabs.append(self.pending_tabs[tab])  # never opened, so nothing changed
+                continue
+            if tab in self.viewers:
+                viewer = self.viewers[tab]
+                tabs.append({"title": self.tab_control.tab(tab, "text"), "viewer": viewer.file_path,
+                             "top": viewer.current_line() or 0, "follow": viewer.follow.get()})
+                continue
+            view = self.views[tab]
+            top = view.first_line + int(view.text_area.index("@0,0").split(".")[0]) - 1
+            line, column = view.cursor_position()
+            entry = {"title": self.tab_control.tab(tab, "text"), "file_path": view.file_path,
+                     "line": line - 1, "column": column, "top": top}
+            if view.is_modified():
+                entry["snapshot"] = uuid.uuid4().hex + ".txt"
+                for _ in write_chunks(view.doc, os.path.join(SESSION_DIR, entry["snapshot"]), threading.Event()):
+                    pass
+            tabs.append(entry)
+        selected = self.tab_control.select()
+        session = {"selected": self.tab_control.index(selected) if selected else 0, "tabs": tabs}
+        with open(SESSION_FILE + ".tmp", "w") as file:
+            json.dump(session, file, indent=1)
+        os.replace(SESSION_FILE + ".tmp", SESSION_FILE)
+
+        # Snapshots of the previous session that no tab refers to any more
+        kept = {entry.get("snapshot") for entry in tabs}
+        for name in os.listdir(SESSION_DIR):
+            if name.endswith(".txt") and name not in kept:
+                os.remove(os.path.join(SESSION_DIR, name))
+
+    def restore_session(self):
+        """Recreate the tabs of the last session; returns False if there was none.
+
+        Tabs start out as empty frames holding only their session entry; the
+        content is loaded by activate_tab when a tab is first selected, so
+        startup time and memory don't depend on how many tabs were open.
+        """
+        try:
+            with open(SESSION_FILE, "r") as file:
+                session = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if not session.get("tabs"):
+            return False
+        tabs = []
+        for entry in session["tabs"]:
+            tab = tk.Frame(self.tab_control)
+            self.pending_tabs[tab] = entry
+            self.tab_control.add(tab, text=entry.get("title", "Untitled"))
+            tabs.append(tab)
+        self.tab_control.select(tabs[min(session.get("selected", 0), len(tabs) - 1)])
+        self.on_tab_changed()
+        return True
+
     def undo(self):
         """Undo the last action."""
-        text_area = self.get_current_text_area()
-        if text_area:
-            text_area.edit_undo()
+        view = self.get_current_view()
+        if view:
+            view.undo()
 
     def redo(self):
         """Redo the last undone action."""
-        text_area = self.get_current_text_area()
-        if text_area:
-            text_area.edit_redo()
+        view = self.get_current_view()
+        if view:
+            view.redo()
 
     def cut_text(self):
         """Cut the selected text."""
@@ -154,16 +829,100 @@ class TextEditor:
         if text_area:
             text_area.delete(tk.SEL_FIRST, tk.SEL_LAST)
 
+    def pack_bar(self, bar):
+        """Show a bar at the bottom of the window, above the status bar if that is shown."""
+        if self.show_status_bar:
+            bar.pack(side=tk.BOTTOM, fill=tk.X, before=self.status_bar)
+        else:
+            bar.pack(side=tk.BOTTOM, fill=tk.X)
+
     def find_replace(self):
-        """Find and replace text."""
-        find_str = simpledialog.askstring("Find", "Enter text to find:")
-        replace_str = simpledialog.askstring("Replace", "Enter replacement text:")
-        if find_str and replace_str:
-            text_area = self.get_current_text_area()
-            content = text_area.get("1.0", tk.END)
-            new_content = content.replace(find_str, replace_str)
-            text_area.delete("1.0", tk.END)
-            text_area.insert(tk.END, new_content)
+        """Show the find bar."""
+        self.pack_bar(self.find_bar)
+        self.find_open = True
+        self.find_entry.focus_set()
+        self.find_entry.select_range(0, tk.END)
+        self.update_find()
+
+    def close_find(self):
+        """Hide the find bar and its highlights."""
+        self.find_bar.pack_forget()
+        self.find_open = False
+        self.finder = None
+        for view in self.views.values():
+            view.highlight(None)
+        text_area = self.get_current_text_area()
+        if text_area:
+            text_area.focus_set()
+
+    def schedule_find(self):
+        """Update the search shortly after the last keystroke instead of on every one."""
+        if self.find_after:
+            self.root.after_cancel(self.find_after)
+        self.find_after = self.root.after(150, self.update_find)
+
+    def update_find(self):
+        """Compile the query and highlight its matches in the current tab."""
+        self.find_after = None
+        if not self.find_open:
+            return
+        self.finder = None
+        self.find_entry.config(background="white")
+        self.find_message.config(text="")
+        if self.find_var.get():
+            try:
+                self.finder = Finder(self.find_var.get(), self.regex_var.get(), not self.case_var.get())
+            except re.error as error:
+                self.find_entry.config(background="#f4c7c3")
+                self.find_message.config(text=f"Invalid pattern: {error}")
+        for view in self.views.values():
+            view.highlight(None)
+        view = self.get_current_view()
+        if view:
+            view.highlight(self.finder)
+
+    def find_next(self, backwards=False):
+        """Select the next (or previous) match after the cursor, wrapping around the document."""
+        view = self.get_current_view()
+        if not view or not self.finder:
+            return
+        anchor = tk.SEL_FIRST if backwards and view.text_area.tag_ranges(tk.SEL) else tk.INSERT
+        found = self.finder.find_next(view.doc, view.offset_of(anchor), backwards)
+        if found:
+            view.select(found[0], found[1])
+            self.find_message.config(text="")
+            self.update_status()
+        else:
+            self.find_message.config(text="No matches")
+
+    def replace_one(self):
+        """Replace the selected match, then select the next one."""
+        view = self.get_current_view()
+        if not view or not self.finder or self.task:
+            return
+        text_area = view.text_area
+        if text_area.tag_ranges(tk.SEL):
+            match = self.finder.pattern.fullmatch(text_area.get(tk.SEL_FIRST, tk.SEL_LAST))
+            if match:
+                start = text_area.index(tk.SEL_FIRST)
+                text_area.delete(tk.SEL_FIRST, tk.SEL_LAST)
+                text_area.insert(start, self.finder.expand(match, self.replace_var.get()))
+        self.find_next()
+
+    def replace_all(self):
+        """Replace every match in the current tab as a single undo step."""
+        view = self.get_current_view()
+        if not view or not self.finder:
+            return
+        if self.task:
+            messagebox.showinfo("Busy", "Wait for the current file operation to finish or cancel it.")
+            return
+        try:
+            count = view.replace_all(self.finder, self.replace_var.get())
+        except re.error as error:  # e.g. a bad group reference in the replacement
+            self.find_message.config(text=f"Invalid replacement: {error}")
+            return
+        self.find_message.config(text=f"Replaced {count} matches")
 
     def choose_font(self):
         """Change the font."""
@@ -190,9 +949,14 @@ class TextEditor:
 
     def update_status(self, event=None):
         """Update the status bar with cursor position."""
-        text_area = self.get_current_text_area()
-        if text_area:
-            line, column = text_area.index(tk.INSERT).split(".")
+        viewer = self.get_current_viewer()
+        if viewer:
+            line = viewer.current_line()
+            position = f"Line {line + 1}" if line is not None else f"Indexing {viewer.file.indexed():.0%}"
+            self.status_bar.config(text=f"{position}, read-only{', following' if viewer.follow.get() else ''}")
+        view = self.get_current_view()
+        if view:
+            line, column = view.cursor_position()
             self.status_bar.config(text=f"Line {line}, Column {column}")
 
     def show_about(self):
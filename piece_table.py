@@ -0,0 +1,152 @@
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    """A read-only text buffer with sparse newline checkpoints.
+
+    The number of newlines before every BLOCK-th character is stored, so
+    counting newlines up to an offset, or finding the n-th newline, only
+    scans a single block instead of the whole text.
+    """
+
+    BLOCK = 1 << 16
+
+    def __init__(self, text):
+        self.text = text
+        self.checkpoints = array("q", [0])
+        total = 0
+        for start in range(0, len(text), self.BLOCK):
+            total += text.count("\n", start, start + self.BLOCK)
+            self.checkpoints.append(total)
+
+    def newlines_before(self, pos):
+        """Number of newlines in text[:pos]."""
+        block = pos // self.BLOCK
+        return self.checkpoints[block] + self.text.count("\n", block * self.BLOCK, pos)
+
+    def find_newline(self, n):
+        """Offset of newline number n (0-based) in the text."""
+        block = bisect_right(self.checkpoints, n) - 1
+        pos = block * self.BLOCK - 1
+        for _ in range(n - self.checkpoints[block] + 1):
+            pos = self.text.find("\n", pos + 1)
+        return pos
+
+
+class PieceTable:
+    """Document model: the text is a list of pieces of immutable buffers.
+
+    The original file content is kept in one buffer and every edit adds a
+    new buffer plus a few pieces, so edits never copy the document. Each
+    piece is (buffer, start, end, newlines).
+    """
+
+    def __init__(self, text=""):
+        self.pieces = []
+        self.length = 0
+        self.newlines = 0
+        if text:
+            self.pieces.append(self._piece(LineIndex(text), 0, len(text)))
+            self.length = len(text)
+            self.newlines = self.pieces[0][3]
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """A table made of the given strings, one buffer each, without joining them."""
+        table = cls()
+        table.pieces = [cls._piece(LineIndex(chunk), 0, len(chunk)) for chunk in chunks if chunk]
+        table.length = sum(piece[2] for piece in table.pieces)
+        table.newlines = sum(piece[3] for piece in table.pieces)
+        return table
+
+    @staticmethod
+    def _piece(buffer, start, end):
+        return (buffer, start, end, buffer.newlines_before(end) - buffer.newlines_before(start))
+
+    def __len__(self):
+        return self.length
+
+    def line_count(self):
+        """Number of lines (a trailing newline starts one more, empty, line)."""
+        return self.newlines + 1
+
+    def replace(self, start, end, text=""):
+        """Replace the characters in [start, end) with text."""
+        before, after = [], []
+        pos = 0
+        for piece in self.pieces:
+            buffer, piece_start, piece_end, _ = piece
+            size = piece_end - piece_start
+            if pos + size <= start:
+                before.append(piece)
+            elif pos >= end:
+                after.append(piece)
+            else:
+                if pos < start:
+                    before.append(self._piece(buffer, piece_start, piece_start + start - pos))
+                if pos + size > end:
+                    after.append(self._piece(buffer, piece_start + end - pos, piece_end))
+            pos += size
+        middle = [self._piece(LineIndex(text), 0, len(text))] if text else []
+        self.pieces = before + middle + after
+        self.length = sum(piece[2] - piece[1] for piece in self.pieces)
+        self.newlines = sum(piece[3] for piece in self.pieces)
+
+    def snapshot(self):
+        """A copy that later edits to this table don't affect; buffers are shared."""
+        copy = PieceTable()
+        copy.pieces, copy.length, copy.newlines = self.pieces, self.length, self.newlines
+        return copy
+
+    def insert(self, offset, text):
+        self.replace(offset, offset, text)
+
+    def delete(self, start, end):
+        self.replace(start, end)
+
+    def chunks(self, start=0, end=None, size=1 << 20):
+        """Yield the text in [start, end) as strings of at most size characters."""
+        end = self.length if end is None else end
+        pos = 0
+        for buffer, piece_start, piece_end, _ in self.pieces:
+            piece_size = piece_end - piece_start
+            if pos + piece_size > start and pos < end:
+                first = piece_start + max(start - pos, 0)
+                last = piece_start + min(end - pos, piece_size)
+                for chunk_start in range(first, last, size):
+                    yield buffer.text[chunk_start:min(chunk_start + size, last)]
+            pos += piece_size
+            if pos >= end:
+                break
+
+    def get(self, start=0, end=None):
+        """The text in [start, end)."""
+        return "".join(self.chunks(start, end))
+
+    def line_start(self, line):
+        """Offset of the first character of a line (0-based), clamped to the document."""
+        if line <= 0:
+            return 0
+        if line > self.newlines:
+            return self.length
+        pos = seen = 0
+        for buffer, piece_start, piece_end, newlines in self.pieces:
+            if seen + newlines >= line:
+                n = buffer.newlines_before(piece_start) + line - seen - 1
+                return pos + buffer.find_newline(n) - piece_start + 1
+            seen += newlines
+            pos += piece_end - piece_start
+        return self.length
+
+    def line_of(self, offset):
+        """Line number (0-based) that the character at offset is on."""
+        pos = seen = 0
+        for buffer, piece_start, piece_end, newlines in self.pieces:
+            size = piece_end - piece_start
+            if offset < pos + size:
+                return seen + buffer.newlines_before(piece_start + offset - pos) - \
+                    buffer.newlines_before(piece_start)
+            seen += newlines
+            pos += size
+        return seen
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core import board_at_distance, format_board, new_board, parse_board, random_board, solve
+from solver import load_database, small_board
+
+# Batch solver and benchmark for the slide puzzle, no display needed.
+#
+#   python batch.py --generate 1000 --size 4x4 --moves 80 --seed 0 > boards.txt
+#   python batch.py --generate 1000 --size 5x5 --uniform > boards.txt
+#   python batch.py --generate 100 --size 4x4 --distance 40 --database > boards.txt
+#   python batch.py boards.txt [--workers N] [--database] [--optimal] [--output results.json]
+#
+# Boards are read one per line (see core.py for the format; blank lines and # comments are skipped)
+# and solved across a process pool. Each instance's time, nodes expanded, nodes/sec and solution
+# length are printed and, with --output, saved as JSON so runs can be compared.
+
+OPTIMAL_STEPS = ((1, None),)
+
+
+def read_boards(path):
+    boards = []
+    with open(path, 'r') as f:
+        for number, line in enumerate(f, 1):
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+            try:
+                boards.append(parse_board(line))
+            except ValueError as error:
+                raise SystemExit('%s:%d: %s' % (path, number, error))
+    return boards
+
+
+def init_worker(sizes):
+    # map the pattern databases once per worker instead of once per board
+    for width, height in sizes:
+        load_database(width, height)
+
+
+def solve_one(board, steps, use_database):
+    result = solve(board, steps, use_database)
+    result['board'] = format_board(board)
+    result['moves'] = ' '.join(result['moves'] or ())
+    return result
+
+
+def run_batch(boards, workers=None, steps=None, use_database=False):
+    # solve every board across a process pool; yields results in input order.
+    # pattern databases only exist for small_board shapes, so other boards are solved without one
+    sizes = {(board.width, board.height) for board in boards
+             if small_board(board.width, board.height)} if use_database else set()
+    for width, height in sizes:
+        load_database(width, height)  # build missing tables once, before the workers all try to
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(sizes,)) as pool:
+        yield from pool.map(solve_one, boards, [steps] * len(boards), [use_database] * len(boards),
+                            chunksize=max(1, len(boards) // (4 * (workers or os.cpu_count() or 1))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve slide puzzle boards from a file across processes.")
+    parser.add_argument('boards', nargs='?', help="file with one board per line")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument('--database', action='store_true', help="use the pattern database heuristic")
+    parser.add_argument('--optimal', action='store_true',
+                        help="plain IDA*, no weighted fallback (3x3 to 4x4 boards)")
+    parser.add_argument('--output', help="save the results as JSON")
+    parser.add_argument('--quiet', action='store_true', help="only print the summary")
+    parser.add_argument('--generate', type=int, metavar='N', help="print N scrambled boards instead")
+    parser.add_argument('--size', default='4x4')
+    parser.add_argument('--moves', type=int, default=80, help="scramble length for --generate")
+    parser.add_argument('--uniform', action='store_true', help="uniformly random boards for --generate")
+    parser.add_argument('--distance', type=int, help="boards this many moves from solved for --generate")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.generate:
+        width, height = (int(n) for n in args.size.lower().split('x'))
+        seed = args.seed if args.seed is not None else time.time_ns()
+        for i in range(args.generate):
+            if args.distance is not None:
+                board = board_at_distance(width, height, args.distance, seed + i, use_database=args.database)[0]
+            elif args.uniform:
+                board = random_board(width, height, seed + i)
+            else:
+                board = new_board(width, height, args.moves, seed + i)[0]
+            print(format_board(board))
+        return
+    if not args.boards:
+        parser.error("a boards file is needed unless --generate is given")
+
+    boards = read_boards(args.boards)
+    if args.optimal:
+        # plain IDA* has no budget, and above 4x4 or on thin boards it doesn't finish
+        for number, board in enumerate(boards, 1):
+            if not small_board(board.width, board.height):
+                parser.error("--optimal only solves 3x3 to 4x4 boards, board %d is %dx%d"
+                             % (number, board.width, board.height))
+    steps = OPTIMAL_STEPS if args.optimal else None
+    start = time.perf_counter()
+    results = []
+    if not args.quiet:
+        print(f"{'#':>5s} {'seconds':>9s} {'nodes':>10s} {'nodes/s':>10s} {'length':>6s}")
+    for number, result in enumerate(run_batch(boards, args.workers, steps, args.database), 1):
+        results.append(result)
+        if not args.quiet:
+            # '-' for a board the solver gave up on
+            length = f"{result['length']:6d}" if result['length'] is not None else f"{'-':>6s}"
+            print(f"{number:5d} {result['seconds']:9.3f} {result['nodes']:10d} "
+                  f"{result['nodes_per_sec']:10.0f} {length}")
+    wall = time.perf_counter() - start
+    if not results:
+        print("No boards to solve.")
+        return
+
+    seconds = [result['seconds'] for result in results]
+    nodes = sum(result['nodes'] for result in results)
+    print(f"\n{len(results)} boards in {wall:.2f}s wall, {len(results) / wall:.1f} boards/s")
+    print(f"solve time  mean {statistics.mean(seconds):.3f}s  median {statistics.median(seconds):.3f}s  "
+          f"max {max(seconds):.3f}s")
+    print(f"nodes       {nodes} total, {nodes / sum(seconds):.0f}/s per worker")
+    lengths = [result['length'] for result in results if result['length'] is not None]
+    if lengths:
+        print(f"length      mean {statistics.mean(lengths):.1f}")
+    if len(lengths) < len(results):
+        print(f"unsolved    {len(results) - len(lengths)} boards")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                       'machine': platform.platform(), 'cpus': os.cpu_count(), 'workers': args.workers,
+                       'database': args.database, 'optimal': args.optimal, 'wall_seconds': wall,
+                       'results': results}, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
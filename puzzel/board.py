@@ -0,0 +1,97 @@
+# Compact slide puzzle board: the tiles in row-major order, packed 4 bits per cell into one integer
+# for boards of up to 16 cells (4x4) and one byte per cell in a bytearray for larger ones.
+# The blank (0) is tracked, so checking and making a move is O(1) instead of a scan of the board.
+# key() is a hashable snapshot of the state, for transposition tables and visited sets.
+
+UP = 'up'
+DOWN = 'down'
+LEFT = 'left'
+RIGHT = 'right'
+OPPOSITE = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+
+class PackedBoard:
+
+    def __init__(self, width, height, tiles):
+        self.width = width
+        self.height = height
+        self.blank = list(tiles).index(0)
+        if width * height <= 16:
+            self.cells = None
+            self.packed = sum(tile << (4 * pos) for pos, tile in enumerate(tiles))
+        else:
+            self.cells = bytearray(tiles)
+            self.packed = None
+        # offset of the cell whose tile slides into the blank, per move (pzl.py names the tile's direction)
+        self.offsets = {UP: width, DOWN: -width, LEFT: 1, RIGHT: -1}
+
+    @classmethod
+    def solved(cls, width, height):
+        return cls(width, height, list(range(1, width * height)) + [0])
+
+    @classmethod
+    def from_columns(cls, board):
+        # from pzl.py's layout: board[x][y], None for the blank
+        width, height = len(board), len(board[0])
+        return cls(width, height, [board[x][y] or 0 for y in range(height) for x in range(width)])
+
+    def to_columns(self):
+        return [[self.tile(x, y) for y in range(self.height)] for x in range(self.width)]
+
+    def tiles(self):
+        # row-major tile numbers, 0 for the blank
+        if self.cells is not None:
+            return list(self.cells)
+        return [(self.packed >> (4 * pos)) & 15 for pos in range(self.width * self.height)]
+
+    def at(self, pos):
+        if self.cells is not None:
+            return self.cells[pos]
+        return (self.packed >> (4 * pos)) & 15
+
+    def tile(self, x, y):
+        # tile number at column x, row y, or None for the blank like the list boards
+        return self.at(y * self.width + x) or None
+
+    def blank_xy(self):
+        return self.blank % self.width, self.blank // self.width
+
+    def can_move(self, direction):
+        x, y = self.blank % self.width, self.blank // self.width
+        return (direction == UP and y != self.height - 1) or (direction == DOWN and y != 0) or \
+            (direction == LEFT and x != self.width - 1) or (direction == RIGHT and x != 0)
+
+    def move(self, direction):
+        # slide the tile next to the blank in the given direction into it; the move must be valid
+        source = self.blank + self.offsets[direction]
+        if self.cells is not None:
+            self.cells[self.blank], self.cells[source] = self.cells[source], 0
+        else:
+            tile = (self.packed >> (4 * source)) & 15
+            self.packed += (tile << (4 * self.blank)) - (tile << (4 * source))
+        self.blank = source
+
+    def moved(self, direction):
+        board = self.copy()
+        board.move(direction)
+        return board
+
+    def valid_moves(self):
+        return [direction for direction in (UP, DOWN, LEFT, RIGHT) if self.can_move(direction)]
+
+    def copy(self):
+        board = PackedBoard.__new__(PackedBoard)
+        board.__dict__.update(self.__dict__)
+        if self.cells is not None:
+            board.cells = bytearray(self.cells)
+        return board
+
+    def key(self):
+        # hashable state: the packed integer, or the bytes of the cells
+        return self.packed if self.cells is None else bytes(self.cells)
+
+    def __eq__(self, other):
+        return isinstance(other, PackedBoard) and (self.width, self.height) == (other.width, other.height) \
+            and self.key() == other.key()
+
+    __hash__ = None  # boards change in place; hash key() instead
@@ -0,0 +1,95 @@
+import random
+
+from board import OPPOSITE, PackedBoard
+from solver import Solver, is_solvable, load_database, quick_solve, small_board, solve_board
+
+# Headless slide puzzle API: generate, read/write, validate and solve boards without pygame.
+# Board text format: the tiles in reading order separated by spaces or commas, 0 for the blank,
+# optionally preceded by the size ("3x4: 1 2 3 ..."); without it the board must be square.
+
+
+def new_board(width=4, height=4, moves=80, seed=None):
+    # scramble a solved board with random moves (never undoing the previous one); returns (board, moves)
+    rng = random.Random(seed)
+    board = PackedBoard.solved(width, height)
+    sequence = []
+    for _ in range(moves):
+        options = [move for move in board.valid_moves() if not sequence or move != OPPOSITE[sequence[-1]]]
+        move = rng.choice(options)
+        board.move(move)
+        sequence.append(move)
+    return board, sequence
+
+
+def random_board(width=4, height=4, seed=None):
+    # a uniformly random solvable board: shuffle every tile, and if that can't be solved swap two
+    # numbered tiles, which flips the parity; each solvable board is reached from exactly two shuffles
+    tiles = list(range(width * height))
+    random.Random(seed).shuffle(tiles)
+    if not is_solvable(tiles, width, height):
+        first, second = [pos for pos, tile in enumerate(tiles) if tile][:2]
+        tiles[first], tiles[second] = tiles[second], tiles[first]
+    return PackedBoard(width, height, tiles)
+
+
+def board_at_distance(width, height, distance, seed=None, tries=20, max_nodes=200000, use_database=False):
+    # a board whose shortest solution is distance moves, or the closest one found in tries attempts.
+    # Boards come from random walks; a walk's optimal length keeps the walk's parity, so the walk is
+    # lengthened or shortened by the difference until the solver measures the wanted distance.
+    # Returns (board, measured distance); boards the solver can't finish within max_nodes are skipped.
+    rng = random.Random(seed)
+    database = load_database(width, height) if use_database and small_board(width, height) else None
+    walk = distance
+    best, best_distance = None, None
+    for _ in range(tries):
+        board = PackedBoard.solved(width, height)
+        previous = None
+        for _ in range(walk):
+            move = rng.choice([move for move in board.valid_moves() if move != OPPOSITE.get(previous)])
+            board.move(move)
+            previous = move
+        moves = Solver(width, height, 1, database).solve(board.tiles(), max_nodes)
+        if moves is None:
+            walk = max(walk - 2, 0)
+            continue
+        if best is None or abs(len(moves) - distance) < abs(best_distance - distance):
+            best, best_distance = board, len(moves)
+        if len(moves) == distance:
+            break
+        walk = max(walk + distance - len(moves), 0)
+    return best or PackedBoard.solved(width, height), best_distance or 0
+
+
+def parse_board(text):
+    size, _, tiles = text.rpartition(':')
+    tiles = [int(tile) for tile in tiles.replace(',', ' ').split()]
+    if size.strip():
+        width, height = (int(n) for n in size.lower().split('x'))
+    else:
+        width = height = int(round(len(tiles) ** 0.5))
+    return validate(width, height, tiles)
+
+
+def format_board(board):
+    return '%dx%d: %s' % (board.width, board.height, ' '.join(map(str, board.tiles())))
+
+
+def validate(width, height, tiles):
+    # return the tiles as a PackedBoard, or raise ValueError saying why they aren't a solvable board
+    if not 2 <= width <= 8 or not 2 <= height <= 8:
+        raise ValueError('board sizes go from 2x2 to 8x8, not %dx%d' % (width, height))
+    if sorted(tiles) != list(range(width * height)):
+        raise ValueError('a %dx%d board needs each of the tiles 0..%d once' % (width, height, width * height - 1))
+    if not is_solvable(tiles, width, height):
+        raise ValueError('this arrangement can not be solved')
+    return PackedBoard(width, height, tiles)
+
+
+def solve(board, steps=None, use_database=False):
+    # solve a board and report how the search went; without steps, the way quick_solve picks by shape
+    if steps is None:
+        moves, nodes, seconds = quick_solve(board, use_database)
+    else:
+        moves, nodes, seconds = solve_board(board, steps, use_database)
+    return {'moves': moves, 'length': len(moves) if moves is not None else None, 'nodes': nodes,
+            'seconds': seconds, 'nodes_per_sec': nodes / seconds if seconds else 0.0}
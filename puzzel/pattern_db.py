@@ -0,0 +1,149 @@
+import mmap
+import os
+import sys
+
+# Additive disjoint pattern databases for the slide puzzle solver.
+# The tiles are split into disjoint groups (patterns). For each pattern a breadth-first search from
+# the goal records the fewest moves of the pattern's own tiles that bring them home from every
+# arrangement, with the other tiles treated as indistinguishable. Only pattern tile moves are
+# counted, so the values of all patterns can be added up and still never overestimate.
+#
+# A table is a byte array indexed by sum(position of the i-th tile * size ** i), so the solver can
+# update the index of a pattern in O(1) when one of its tiles moves. Tables are built once, saved
+# under pdb/ and memory-mapped when loaded.
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+UNSEEN = 255
+
+
+def default_patterns(width, height):
+    # groups of tiles in reading order: 5-5-5 for 4x4, 4-4 for 3x3. The solver only uses databases up
+    # to 4x4 (bigger boards are solved in parts), so there are no defaults for those
+    if width * height > 16:
+        raise ValueError('no default patterns for %dx%d boards, only up to 4x4' % (width, height))
+    tiles = list(range(1, width * height))
+    group = 5 if width * height == 16 else 4
+    return [tuple(tiles[i:i + group]) for i in range(0, len(tiles), group)]
+
+
+def neighbour_masks(width, height):
+    masks = []
+    for pos in range(width * height):
+        row, col = divmod(pos, width)
+        mask = 0
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < height and 0 <= c < width:
+                mask |= 1 << (r * width + c)
+        masks.append(mask)
+    return masks
+
+
+def build_table(width, height, pattern):
+    # BFS over (arrangement of the pattern tiles, blank area); moving the blank through other tiles
+    # is free, so the blank is represented by the whole area it can reach, named by its lowest cell
+    size = width * height
+    k = len(pattern)
+    neighbours = neighbour_masks(width, height)
+    full = (1 << size) - 1
+    weights = [size ** i for i in range(k)]
+    table = bytearray([UNSEEN]) * size ** k
+    seen = bytearray(size ** k * size // 8 + 1)
+
+    # cells that may shift left/right without wrapping to the neighbouring row
+    left_ok = sum(1 << pos for pos in range(size) if pos % width)
+    right_ok = sum(1 << pos for pos in range(size) if pos % width != width - 1)
+
+    def reach(start, free):
+        area = start
+        while True:
+            grown = (area | (area & left_ok) >> 1 | (area & right_ok) << 1 | area >> width | area << width) & free
+            if grown == area:
+                return area
+            area = grown
+
+    positions = tuple(tile - 1 for tile in pattern)  # tile t belongs on cell t - 1
+    occupied = sum(1 << pos for pos in positions)
+    area = reach(1 << (size - 1), full ^ occupied)
+    index = sum(pos * weight for pos, weight in zip(positions, weights))
+    key = index * size + (area & -area).bit_length() - 1
+    seen[key >> 3] |= 1 << (key & 7)
+    frontier = [(positions, area, index, occupied)]
+    distance = 0
+    while frontier:
+        next_frontier = []
+        for positions, area, index, occupied in frontier:
+            if table[index] == UNSEEN:
+                table[index] = distance
+            for i, pos in enumerate(positions):
+                targets = neighbours[pos] & area
+                while targets:
+                    target = targets & -targets
+                    targets ^= target
+                    new_pos = target.bit_length() - 1
+                    new_occupied = occupied ^ (1 << pos) ^ target
+                    new_area = reach(1 << pos, full ^ new_occupied)
+                    new_index = index + (new_pos - pos) * weights[i]
+                    key = new_index * size + (new_area & -new_area).bit_length() - 1
+                    if not seen[key >> 3] & (1 << (key & 7)):
+                        seen[key >> 3] |= 1 << (key & 7)
+                        next_frontier.append((positions[:i] + (new_pos,) + positions[i + 1:], new_area,
+                                              new_index, new_occupied))
+        frontier = next_frontier
+        distance += 1
+    return table
+
+
+def table_path(width, height, pattern, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, '%dx%d-%s.pdb' % (width, height, '-'.join(map(str, pattern))))
+
+
+def load_table(width, height, pattern, cache_dir=CACHE_DIR):
+    # memory-map a saved table, building and saving it first if there is none
+    path = table_path(width, height, pattern, cache_dir)
+    if not os.path.exists(path):
+        table = build_table(width, height, pattern)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(table)
+        os.replace(path + '.tmp', path)
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class PatternDatabase:
+    # the tables of a set of disjoint patterns covering every tile of one board size
+
+    def __init__(self, width, height, patterns=None, cache_dir=CACHE_DIR):
+        self.width = width
+        self.height = height
+        self.patterns = [tuple(pattern) for pattern in (patterns or default_patterns(width, height))]
+        size = width * height
+        if sorted(tile for pattern in self.patterns for tile in pattern) != list(range(1, size)):
+            raise ValueError('patterns must split the tiles 1..%d into disjoint groups' % (size - 1))
+        self.tables = [load_table(width, height, pattern, cache_dir) for pattern in self.patterns]
+        # owner[tile], weight[tile]: the pattern a tile belongs to and its digit in that pattern's index
+        self.owner = [None] * size
+        self.weight = [0] * size
+        for number, pattern in enumerate(self.patterns):
+            for i, tile in enumerate(pattern):
+                self.owner[tile] = number
+                self.weight[tile] = size ** i
+
+    def indexes(self, tiles):
+        # table index of every pattern for row-major tiles
+        indexes = [0] * len(self.patterns)
+        for pos, tile in enumerate(tiles):
+            if tile:
+                indexes[self.owner[tile]] += pos * self.weight[tile]
+        return indexes
+
+    def heuristic(self, tiles):
+        return sum(table[index] for table, index in zip(self.tables, self.indexes(tiles)))
+
+
+if __name__ == '__main__':
+    # python pattern_db.py [WIDTH HEIGHT]: build the default tables ahead of time
+    width, height = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) == 3 else (4, 4)
+    database = PatternDatabase(width, height)
+    for pattern in database.patterns:
+        print(table_path(width, height, pattern))
@@ -1,12 +1,17 @@
 import pygame
 import sys
-import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pygame.locals import *
 
+from board import PackedBoard
+from core import random_board
+from solver import load_database, quick_solve, small_board
+
 # this section holds all the variables that we will use in Puzzle Game In Python
-w_of_board = 4  # total number of columns in the board of Puzzle Game In Python
+w_of_board = 4  # total number of columns in the board of Puzzle Game In Python, 3 to 8 (keys 3-8 change it)
 h_of_board = 4  # total number of rows in the board
-block_size = 80
+block_size = 80  # the largest tile size; set_board_size shrinks it so bigger boards fit the window
 win_width = 640
 win_height = 480
 FPS = 30
@@ -32,9 +37,15 @@ BUTTONCOLOR = WHITE
 BUTTONTEXTCOLOR = BLACK
 MESSAGECOLOR = GREEN
 
-# this is to leave the space on both the sides of the block
-XMARGIN = int((win_width - (block_size * w_of_board + (w_of_board - 1))) / 2)
-YMARGIN = int((win_height - (block_size * h_of_board + (h_of_board - 1))) / 2)
+# this is to leave the space on both the sides of the block (set by set_board_size)
+XMARGIN = 0
+YMARGIN = 0
+
+# pre-rendered surfaces: tiles by (number, size) and texts by (text, color, bgcolor)
+TILE_SURFS = {}
+TEXT_SURFS = {}
+# what is on screen, so only the parts that change get redrawn (see update_screen)
+SHOWN = {'tiles': None, 'message': None, 'message_rect': None}
 
 # these are the variables for handling the keyboard keys
 UP = 'up'
@@ -47,6 +58,7 @@ RIGHT = 'right'
 
 def main():
     global FPSCLOCK, DISPLAYSURF, BASICFONT, RESET_SURF, RESET_RECT, NEW_SURF, NEW_RECT, SOLVE_SURF, SOLVE_RECT
+    global SIZE_SURF, SIZE_RECT
 
     pygame.init()
     FPSCLOCK = pygame.time.Clock()
@@ -63,13 +75,26 @@ def main():
         'New Game', TEXT, BGCOLOR, win_width - 120, win_height - 280)
     SOLVE_SURF, SOLVE_RECT = makeText(
         'Solve',    TEXT, BGCOLOR, win_width - 120, win_height - 250)
+    SIZE_SURF, SIZE_RECT = makeText(
+        'Press 3-8 to change the board size', TEXT, BGCOLOR, 5, win_height - 30)
 
-    mainBoard, solutionSeq = generateNewPuzzle(80)
+    set_board_size(w_of_board, h_of_board)
+    mainBoard = generateNewPuzzle()
     # this is simply the board that is same as that of the solved board in Puzzle Game In Python
     # bascially the game will shuffle all blocks of the solved game
     SOLVEDBOARD = start_playing()
     # a list that tracks the moves made from the solved configuration
     allMoves = []
+    # the solver runs on a worker thread so the window keeps drawing while it searches
+    solverThread = ThreadPoolExecutor(max_workers=1)
+    # load (or, the first time ever, build) the pattern database before the first Solve needs it
+    if use_database():
+        solverThread.submit(load_database, w_of_board, h_of_board)
+    solving = None
+    solvingBoard = None
+    stopSolving = threading.Event()
+    # set when the solver gave up, shown until the board changes
+    notice = None
     # main game loop
     while True:
         slideTo = None
@@ -77,8 +102,22 @@ def main():
         msg = 'Click a block or press arrow keys to slide the block.'
         if mainBoard == SOLVEDBOARD:
             msg = 'Solved!'
+        elif notice:
+            msg = notice
+        if solving:
+            msg = 'Solving...'
+            if solving.done():
+                moves, nodes, seconds = solving.result()
+                # the player may have moved or started a new game meanwhile, which stops the search
+                if mainBoard == solvingBoard and not stopSolving.is_set():
+                    if moves is None:
+                        notice = 'No solution found, slide a few tiles and try again.'
+                    else:
+                        solve_animation(mainBoard, moves)
+                        allMoves = []
+                solving = None
 
-        drawBoard(mainBoard, msg)
+        dirtyRects = update_screen(mainBoard, msg)
 
         check_exit_req()
         # the below for loop is to handle the various events of keyboard
@@ -95,12 +134,17 @@ def main():
                         allMoves = []
                     elif NEW_RECT.collidepoint(event.pos):
                         # this below linw will come into action of the user clicked on New Game button
-                        mainBoard, solutionSeq = generateNewPuzzle(80)
+                        stopSolving.set()
+                        mainBoard = generateNewPuzzle()
                         allMoves = []
+                        notice = None
                     elif SOLVE_RECT.collidepoint(event.pos):
                         # this below linw will come into action of the user clicked on Solve button
-                        rst_animation(mainBoard, solutionSeq + allMoves)
-                        allMoves = []
+                        # a search that was stopped is left to end on its own, the new one queues behind it
+                        if (not solving or stopSolving.is_set()) and mainBoard != SOLVEDBOARD:
+                            solvingBoard = mainBoard.copy()
+                            stopSolving = threading.Event()
+                            solving = solverThread.submit(quick_solve, solvingBoard, use_database(), stopSolving)
                 else:
                     # this else block in Puzzle Game In Python is just to check that the moved tile has a blank
                     blankx, blanky = getBlankPosition(mainBoard)
@@ -123,6 +167,17 @@ def main():
                     slideTo = UP
                 elif event.key in (K_DOWN, K_s) and isValidMove(mainBoard, DOWN):
                     slideTo = DOWN
+                elif K_3 <= event.key <= K_8:
+                    # a new game on a square board of that size
+                    stopSolving.set()
+                    size = event.key - K_0
+                    set_board_size(size, size)
+                    mainBoard = generateNewPuzzle()
+                    SOLVEDBOARD = start_playing()
+                    allMoves = []
+                    notice = None
+                    if use_database():
+                        solverThread.submit(load_database, w_of_board, h_of_board)
         # this block will handle the fucntionality of displaying the message for controls
         if slideTo:
             # show slide on screen
@@ -130,7 +185,11 @@ def main():
                 mainBoard, slideTo, 'Click a block or press arrow keys to slide the block.', 8)
             take_turn(mainBoard, slideTo)
             allMoves.append(slideTo)
-        pygame.display.update()
+            notice = None
+            # a solution on its way would be for the old board
+            stopSolving.set()
+        if dirtyRects:
+            pygame.display.update(dirtyRects)
         FPSCLOCK.tick(FPS)
 
 
@@ -153,71 +212,38 @@ def check_exit_req():
         pygame.event.post(event)
 
 
+def set_board_size(width, height):
+    # switch to a width x height board: the biggest tiles (up to 80 pixels) that leave room for the
+    # buttons on the right and the message on top, centred in the window
+    global w_of_board, h_of_board, block_size, XMARGIN, YMARGIN
+    w_of_board, h_of_board = width, height
+    block_size = min(80, (win_width - 260 - (width - 1)) // width, (win_height - 80 - (height - 1)) // height)
+    XMARGIN = int((win_width - (block_size * width + (width - 1))) / 2)
+    YMARGIN = int((win_height - (block_size * height + (height - 1))) / 2)
+    SHOWN['tiles'] = None  # everything moves, so the next update_screen redraws the whole window
+
+
+def use_database():
+    # pattern databases exist up to 4x4; bigger boards would need tables far too large to build
+    return small_board(w_of_board, h_of_board)
+
+
 def start_playing():
     # Return a board structure with blocks in the solved state.
-    counter = 1
-    board = []
-    for x in range(w_of_board):
-        column = []
-        for y in range(h_of_board):
-            column.append(counter)
-            counter += w_of_board
-        board.append(column)
-        counter -= w_of_board * (h_of_board - 1) + w_of_board - 1
-
-    board[w_of_board-1][h_of_board-1] = BLANK
-    return board
+    return PackedBoard.solved(w_of_board, h_of_board)
 
 
 def getBlankPosition(board):
-    # Return the x and y of board coordinates of the blank space.
-    for x in range(w_of_board):
-        for y in range(h_of_board):
-            if board[x][y] == BLANK:
-                return (x, y)
+    # Return the x and y of board coordinates of the blank space (tracked by the board, no scan).
+    return board.blank_xy()
 
 
 def take_turn(board, move):
-    blankx, blanky = getBlankPosition(board)
-
-    if move == UP:
-        board[blankx][blanky], board[blankx][blanky +
-                                             1] = board[blankx][blanky + 1], board[blankx][blanky]
-    elif move == DOWN:
-        board[blankx][blanky], board[blankx][blanky -
-                                             1] = board[blankx][blanky - 1], board[blankx][blanky]
-    elif move == LEFT:
-        board[blankx][blanky], board[blankx +
-                                     1][blanky] = board[blankx + 1][blanky], board[blankx][blanky]
-    elif move == RIGHT:
-        board[blankx][blanky], board[blankx -
-                                     1][blanky] = board[blankx - 1][blanky], board[blankx][blanky]
+    board.move(move)
 
 
 def isValidMove(board, move):
-    blankx, blanky = getBlankPosition(board)
-    return (move == UP and blanky != len(board[0]) - 1) or \
-           (move == DOWN and blanky != 0) or \
-           (move == LEFT and blankx != len(board) - 1) or \
-           (move == RIGHT and blankx != 0)
-
-
-def ramdom_moves(board, lastMove=None):
-    # start with a full list of all four moves
-    validMoves = [UP, DOWN, LEFT, RIGHT]
-
-    # remove moves from the list as they are disqualified
-    if lastMove == UP or not isValidMove(board, DOWN):
-        validMoves.remove(DOWN)
-    if lastMove == DOWN or not isValidMove(board, UP):
-        validMoves.remove(UP)
-    if lastMove == LEFT or not isValidMove(board, RIGHT):
-        validMoves.remove(RIGHT)
-    if lastMove == RIGHT or not isValidMove(board, LEFT):
-        validMoves.remove(LEFT)
-
-    # this will perform the return nad it will return a random move from the list of remaining moves
-    return random.choice(validMoves)
+    return board.can_move(move)
 
 
 def getLeftTopOfTile(block_x, block_y):
@@ -228,8 +254,8 @@ def getLeftTopOfTile(block_x, block_y):
 
 def getSpotClicked(board, x, y):
     # from the x & y pixel coordinates, this for loop below will get the x & y board coordinates
-    for block_x in range(len(board)):
-        for block_y in range(len(board[0])):
+    for block_x in range(board.width):
+        for block_y in range(board.height):
             left, top = getLeftTopOfTile(block_x, block_y)
             tileRect = pygame.Rect(left, top, block_size, block_size)
             if tileRect.collidepoint(x, y):
@@ -237,21 +263,30 @@ def getSpotClicked(board, x, y):
     return (None, None)
 
 
+def tile_surface(number):
+    # the tile with its number, rendered once per number and size
+    key = (number, block_size)
+    if key not in TILE_SURFS:
+        surf = pygame.Surface((block_size, block_size))
+        surf.fill(TILECOLOR)
+        text_renderign = BASICFONT.render(str(number), True, TEXTCOLOR)
+        surf.blit(text_renderign, text_renderign.get_rect(center=(block_size // 2, block_size // 2)))
+        TILE_SURFS[key] = surf
+    return TILE_SURFS[key]
+
+
 def draw_block(block_x, block_y, number, adjx=0, adjy=0):
-    # draw a tile at board coordinates block_x and block_y, optionally a few
+    # draw a tile at board coordinates block_x and block_y, optionally a few pixels off; returns its rect
     left, top = getLeftTopOfTile(block_x, block_y)
-    pygame.draw.rect(DISPLAYSURF, TILECOLOR, (left + adjx,
-                     top + adjy, block_size, block_size))
-    text_renderign = BASICFONT.render(str(number), True, TEXTCOLOR)
-    text_in_rect = text_renderign.get_rect()
-    text_in_rect.center = left + \
-        int(block_size / 2) + adjx, top + int(block_size / 2) + adjy
-    DISPLAYSURF.blit(text_renderign, text_in_rect)
+    return DISPLAYSURF.blit(tile_surface(number), (left + adjx, top + adjy))
 
 
 def makeText(text, color, bgcolor, top, left):
-    # create the Surface and Rect objects for some text.
-    text_renderign = BASICFONT.render(text, True, color, bgcolor)
+    # create the Surface and Rect objects for some text, rendering each text only once.
+    key = (text, color, bgcolor)
+    if key not in TEXT_SURFS:
+        TEXT_SURFS[key] = BASICFONT.render(text, True, color, bgcolor)
+    text_renderign = TEXT_SURFS[key]
     text_in_rect = text_renderign.get_rect()
     text_in_rect.topleft = (top, left)
     return (text_renderign, text_in_rect)
@@ -261,26 +296,71 @@ def makeText(text, color, bgcolor, top, left):
 
 
 def drawBoard(board, message):
+    # redraw the whole window; update_screen only redraws what changed since
     DISPLAYSURF.fill(BGCOLOR)
+    SHOWN['message_rect'] = None
     if message:
         text_renderign, text_in_rect = makeText(
             message, MESSAGECOLOR, BGCOLOR, 5, 5)
         DISPLAYSURF.blit(text_renderign, text_in_rect)
+        SHOWN['message_rect'] = text_in_rect
+    SHOWN['tiles'] = board.tiles()
+    SHOWN['message'] = message
 
-    for block_x in range(len(board)):
-        for block_y in range(len(board[0])):
-            if board[block_x][block_y]:
-                draw_block(block_x, block_y, board[block_x][block_y])
+    for block_x in range(board.width):
+        for block_y in range(board.height):
+            if board.tile(block_x, block_y):
+                draw_block(block_x, block_y, board.tile(block_x, block_y))
 
+    draw_border()
+
+    DISPLAYSURF.blit(RESET_SURF, RESET_RECT)
+    DISPLAYSURF.blit(NEW_SURF, NEW_RECT)
+    DISPLAYSURF.blit(SOLVE_SURF, SOLVE_RECT)
+    DISPLAYSURF.blit(SIZE_SURF, SIZE_RECT)
+    return [DISPLAYSURF.get_rect()]
+
+
+def draw_border():
+    # the border overlaps the outer tiles by a couple of pixels, so it's redrawn after them
     left, top = getLeftTopOfTile(0, 0)
     width = w_of_board * block_size
     height = h_of_board * block_size
     pygame.draw.rect(DISPLAYSURF, BORDERCOLOR, (left - 5,
                      top - 5, width + 11, height + 11), 4)
 
-    DISPLAYSURF.blit(RESET_SURF, RESET_RECT)
-    DISPLAYSURF.blit(NEW_SURF, NEW_RECT)
-    DISPLAYSURF.blit(SOLVE_SURF, SOLVE_RECT)
+
+def update_screen(board, message):
+    # draw only the tiles and message that differ from what is shown; returns the rects to update
+    if SHOWN['tiles'] is None or len(SHOWN['tiles']) != board.width * board.height:
+        return drawBoard(board, message)
+    dirty = []
+    tiles = board.tiles()
+    for pos, (old, new) in enumerate(zip(SHOWN['tiles'], tiles)):
+        if old != new:
+            block_x, block_y = pos % board.width, pos // board.width
+            left, top = getLeftTopOfTile(block_x, block_y)
+            # one pixel more on each side covers the gaps a sliding tile passed over
+            cell = pygame.Rect(left, top, block_size, block_size).inflate(2, 2)
+            DISPLAYSURF.fill(BGCOLOR, cell)
+            if new:
+                draw_block(block_x, block_y, new)
+            dirty.append(cell)
+    if dirty:
+        draw_border()
+    SHOWN['tiles'] = tiles
+    if message != SHOWN['message']:
+        if SHOWN['message_rect']:
+            DISPLAYSURF.fill(BGCOLOR, SHOWN['message_rect'])
+            dirty.append(SHOWN['message_rect'])
+        SHOWN['message_rect'] = None
+        if message:
+            text_renderign, text_in_rect = makeText(message, MESSAGECOLOR, BGCOLOR, 5, 5)
+            DISPLAYSURF.blit(text_renderign, text_in_rect)
+            SHOWN['message_rect'] = text_in_rect
+            dirty.append(text_in_rect)
+        SHOWN['message'] = message
+    return dirty
 
 # this function is to handle the animation that are displayed when a user starts a new Game
 # a user can see the sliding animation over the blocks
@@ -302,52 +382,39 @@ def sliding_animation(board, direction, message, animationSpeed):
         move_in_xaxis = blankx - 1
         move_in_yaxis = blanky
 
-    # prepare the base surface
-    drawBoard(board, message)
-    baseSurf = DISPLAYSURF.copy()
-    # draw a blank space over the moving block on the baseSurf Surface.
+    # bring the screen up to date, then take the moving tile off it
+    pygame.display.update(update_screen(board, message))
+    number = board.tile(move_in_xaxis, move_in_yaxis)
     take_left, take_top = getLeftTopOfTile(move_in_xaxis, move_in_yaxis)
-    pygame.draw.rect(baseSurf, BGCOLOR, (take_left,
-                     take_top, block_size, block_size))
+    lastRect = pygame.Rect(take_left, take_top, block_size, block_size)
+    DISPLAYSURF.fill(BGCOLOR, lastRect)
+    draw_border()
+    baseSurf = DISPLAYSURF.copy()
 
     for i in range(0, block_size, animationSpeed):
         # this is to handle the animation of the tile sliding over
+        # only the tile's old and new rects change, so only they are restored and updated
         check_exit_req()
-        DISPLAYSURF.blit(baseSurf, (0, 0))
+        DISPLAYSURF.blit(baseSurf, lastRect, lastRect)
         if direction == UP:
-            draw_block(move_in_xaxis, move_in_yaxis,
-                       board[move_in_xaxis][move_in_yaxis], 0, -i)
+            rect = draw_block(move_in_xaxis, move_in_yaxis, number, 0, -i)
         if direction == DOWN:
-            draw_block(move_in_xaxis, move_in_yaxis,
-                       board[move_in_xaxis][move_in_yaxis], 0, i)
+            rect = draw_block(move_in_xaxis, move_in_yaxis, number, 0, i)
         if direction == LEFT:
-            draw_block(move_in_xaxis, move_in_yaxis,
-                       board[move_in_xaxis][move_in_yaxis], -i, 0)
+            rect = draw_block(move_in_xaxis, move_in_yaxis, number, -i, 0)
         if direction == RIGHT:
-            draw_block(move_in_xaxis, move_in_yaxis,
-                       board[move_in_xaxis][move_in_yaxis], i, 0)
+            rect = draw_block(move_in_xaxis, move_in_yaxis, number, i, 0)
 
-        pygame.display.update()
+        pygame.display.update([lastRect, rect])
+        lastRect = rect
         FPSCLOCK.tick(FPS)
 
 
-def generateNewPuzzle(numSlides):
-    # this to display the animation of blocks
-    sequence = []
-    board = start_playing()
-    drawBoard(board, '')
-    pygame.display.update()
-    # we used time.wait() to pause 500 milliseconds for effect
-    pygame.time.wait(500)
-    lastMove = None
-    for i in range(numSlides):
-        move = ramdom_moves(board, lastMove)
-        sliding_animation(board, move, 'Generating new puzzle...',
-                          animationSpeed=int(block_size / 3))
-        take_turn(board, move)
-        sequence.append(move)
-        lastMove = move
-    return (board, sequence)
+def generateNewPuzzle():
+    # a new game: a random board that can be solved, shown straight away
+    board = random_board(w_of_board, h_of_board)
+    pygame.display.update(drawBoard(board, ''))
+    return board
 
 
 def rst_animation(board, allMoves):
@@ -369,6 +436,14 @@ def rst_animation(board, allMoves):
         take_turn(board, opp_moves)
 
 
+def solve_animation(board, moves):
+    # slide the tiles along the moves found by the solver
+    for move in moves:
+        sliding_animation(board, move, 'Solving...',
+                          animationSpeed=int(block_size / 2))
+        take_turn(board, move)
+
+
 # this is the call to main fucntion
 if __name__ == '__main__':
     main()
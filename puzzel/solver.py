@@ -0,0 +1,389 @@
+import heapq
+import time
+
+from board import UP, DOWN, LEFT, RIGHT, PackedBoard
+from pattern_db import PatternDatabase
+
+# Optimal solver for the slide puzzle: IDA* guided by Manhattan distance plus linear conflict.
+# Boards above 4x4 are out of its reach; solve_in_parts puts their tiles home a few at a time.
+# It doesn't need pygame, so pzl.py can run it on a worker thread and tools can run it headless.
+# solve_board takes a PackedBoard or a list of columns (board[x][y], None for the blank).
+# Inside the solver a board is a flat list of tiles in row-major order with 0 for the blank.
+
+
+class Unsolvable(ValueError):
+    pass
+
+
+def board_to_tiles(board):
+    # flatten a PackedBoard or list-of-columns board into row-major tiles
+    if isinstance(board, PackedBoard):
+        return board.tiles()
+    width, height = len(board), len(board[0])
+    return [board[x][y] or 0 for y in range(height) for x in range(width)]
+
+
+def tiles_to_board(tiles, width, height):
+    return [[tiles[y * width + x] or None for y in range(height)] for x in range(width)]
+
+
+def goal_tiles(width, height):
+    return list(range(1, width * height)) + [0]
+
+
+def is_solvable(tiles, width, height):
+    # moves keep (inversions + blank row when the width is even) parity, so compare it with the goal's
+    numbers = [tile for tile in tiles if tile]
+    inversions = sum(1 for i, a in enumerate(numbers) for b in numbers[i + 1:] if a > b)
+    if width % 2:
+        return inversions % 2 == 0
+    blank_row = tiles.index(0) // width
+    return (inversions + height - 1 - blank_row) % 2 == 0
+
+
+def apply_moves(tiles, width, height, moves):
+    # return the tiles after sliding tiles into the blank as named by the moves (pzl.py directions)
+    tiles = list(tiles)
+    blank = tiles.index(0)
+    deltas = {UP: width, DOWN: -width, LEFT: 1, RIGHT: -1}
+    for move in moves:
+        source = blank + deltas[move]
+        tiles[blank], tiles[source] = tiles[source], 0
+        blank = source
+    return tiles
+
+
+def longest_increasing(sequence):
+    best = []
+    for i, value in enumerate(sequence):
+        best.append(1 + max([best[j] for j in range(i) if sequence[j] < value], default=0))
+    return max(best, default=0)
+
+
+# how many nodes the search expands between checks of its budget and of cancel
+CHECK_NODES = 10000
+
+
+def move_table(width, height):
+    # moves[blank]: (name, offset of the tile that slides in, vertical?) for every legal move
+    moves = []
+    for blank in range(width * height):
+        row, col = divmod(blank, width)
+        options = []
+        if row < height - 1:
+            options.append((UP, width, True))
+        if row > 0:
+            options.append((DOWN, -width, True))
+        if col < width - 1:
+            options.append((LEFT, 1, False))
+        if col > 0:
+            options.append((RIGHT, -1, False))
+        moves.append(options)
+    return moves
+
+
+class Solver:
+    # IDA* over one board size. weight > 1 trades optimality for speed (weighted IDA*).
+    # With a PatternDatabase the heuristic comes from its tables instead of Manhattan + linear conflict.
+
+    def __init__(self, width, height, weight=1, database=None):
+        self.width = width
+        self.height = height
+        self.weight = weight
+        self.database = database
+        size = width * height
+        self.goal_row = [0] + [(tile - 1) // width for tile in range(1, size)]
+        self.goal_col = [0] + [(tile - 1) % width for tile in range(1, size)]
+        # dist[tile][position]: Manhattan distance of a tile standing on a position
+        self.dist = [[0] * size] + [[abs(pos // width - self.goal_row[tile]) + abs(pos % width - self.goal_col[tile])
+                                     for pos in range(size)] for tile in range(1, size)]
+        self.moves = move_table(width, height)
+        self.conflict_cache = {}
+        self.nodes = 0
+
+    def line_conflict(self, goals):
+        # tiles of a line that sit in their goal line but in the wrong order each need two extra moves
+        # to step aside; only the ones outside the longest correctly ordered subsequence must move
+        value = self.conflict_cache.get(goals)
+        if value is None:
+            value = self.conflict_cache[goals] = 2 * (len(goals) - longest_increasing(goals))
+        return value
+
+    def row_conflict(self, tiles, row):
+        goal_row, goal_col = self.goal_row, self.goal_col
+        line = tiles[row * self.width:(row + 1) * self.width]
+        return self.line_conflict(tuple(goal_col[t] for t in line if t and goal_row[t] == row))
+
+    def col_conflict(self, tiles, col):
+        goal_row, goal_col = self.goal_row, self.goal_col
+        return self.line_conflict(tuple(goal_row[t] for t in tiles[col::self.width] if t and goal_col[t] == col))
+
+    def heuristic(self, tiles):
+        manhattan = sum(self.dist[tile][pos] for pos, tile in enumerate(tiles))
+        conflicts = sum(self.row_conflict(tiles, row) for row in range(self.height)) + \
+            sum(self.col_conflict(tiles, col) for col in range(self.width))
+        return manhattan + conflicts
+
+    def solve(self, tiles, max_nodes=None, cancel=None):
+        # return the list of moves that solves the tiles, or None if max_nodes ran out or the
+        # threading.Event cancel was set
+        tiles = list(tiles)
+        if not is_solvable(tiles, self.width, self.height):
+            raise Unsolvable('this arrangement can not be solved')
+        self.nodes = 0
+        self.max_nodes = max_nodes or float('inf')
+        self.cancel = cancel
+        self.limit = min(CHECK_NODES, self.max_nodes)
+        path = []
+        found = self.search_database(tiles, path) if self.database else self.search_conflicts(tiles, path)
+        return path if found else None
+
+    def check(self):
+        # called when the search passes self.limit: stop, or let it run another CHECK_NODES nodes
+        if self.nodes > self.max_nodes or (self.cancel and self.cancel.is_set()):
+            raise StopIteration
+        self.limit = min(self.nodes + CHECK_NODES, self.max_nodes)
+
+    def deepen(self, search, h):
+        # IDA*: depth-first searches with a growing bound on g + weight * h
+        bound = self.weight * h
+        try:
+            while True:
+                result = search(bound)
+                if result is True:
+                    return True
+                bound = result
+        except StopIteration:
+            return False
+
+    def search_conflicts(self, tiles, path):
+        width, height, weight = self.width, self.height, self.weight
+        dist, moves, goal_row, goal_col = self.dist, self.moves, self.goal_row, self.goal_col
+        row_conflict, col_conflict = self.row_conflict, self.col_conflict
+        rows = [row_conflict(tiles, row) for row in range(height)]
+        cols = [col_conflict(tiles, col) for col in range(width)]
+
+        def search(blank, g, manhattan, conflicts, bound, previous):
+            self.nodes += 1
+            f = g + weight * (manhattan + conflicts)
+            if f > bound:
+                return f
+            if manhattan == 0:
+                return True
+            if self.nodes > self.limit:
+                self.check()
+            smallest = float('inf')
+            for name, offset, vertical in moves[blank]:
+                if offset == -previous:
+                    continue  # undoing the last move never helps
+                source = blank + offset
+                tile = tiles[source]
+                tiles[blank], tiles[source] = tile, 0
+                new_manhattan = manhattan - dist[tile][source] + dist[tile][blank]
+                new_conflicts = conflicts
+                # only the lines the tile left and entered can change, and only if it belongs to one
+                if vertical:
+                    a, b, lines, home, recount = source // width, blank // width, rows, goal_row[tile], row_conflict
+                else:
+                    a, b, lines, home, recount = source % width, blank % width, cols, goal_col[tile], col_conflict
+                changed = home == a or home == b
+                if changed:
+                    old_a, old_b = lines[a], lines[b]
+                    lines[a], lines[b] = recount(tiles, a), recount(tiles, b)
+                    new_conflicts += lines[a] + lines[b] - old_a - old_b
+                path.append(name)
+                result = search(source, g + 1, new_manhattan, new_conflicts, bound, offset)
+                if result is True:
+                    return True
+                path.pop()
+                tiles[blank], tiles[source] = 0, tile
+                if changed:
+                    lines[a], lines[b] = old_a, old_b
+                smallest = min(smallest, result)
+            return smallest
+
+        blank = tiles.index(0)
+        manhattan = sum(dist[tile][pos] for pos, tile in enumerate(tiles))
+        conflicts = sum(rows) + sum(cols)
+        return self.deepen(lambda bound: search(blank, 0, manhattan, conflicts, bound, 0), manhattan + conflicts)
+
+    def search_database(self, tiles, path):
+        # same search, with the heuristic read from the pattern database; a move changes one table index
+        weight, moves = self.weight, self.moves
+        tables, owner, digit = self.database.tables, self.database.owner, self.database.weight
+        indexes = self.database.indexes(tiles)
+
+        def search(blank, g, h, bound, previous):
+            self.nodes += 1
+            f = g + weight * h
+            if f > bound:
+                return f
+            if h == 0:
+                return True
+            if self.nodes > self.limit:
+                self.check()
+            smallest = float('inf')
+            for name, offset, _ in moves[blank]:
+                if offset == -previous:
+                    continue
+                source = blank + offset
+                tile = tiles[source]
+                tiles[blank], tiles[source] = tile, 0
+                pattern = owner[tile]
+                table, old = tables[pattern], indexes[pattern]
+                new = indexes[pattern] = old + (blank - source) * digit[tile]
+                path.append(name)
+                result = search(source, g + 1, h - table[old] + table[new], bound, offset)
+                if result is True:
+                    return True
+                path.pop()
+                tiles[blank], tiles[source] = 0, tile
+                indexes[pattern] = old
+                smallest = min(smallest, result)
+            return smallest
+
+        blank = tiles.index(0)
+        h = self.database.heuristic(tiles)
+        return self.deepen(lambda bound: search(blank, 0, h, bound, 0), h)
+
+
+# loaded pattern databases by board size, see load_database
+DATABASES = {}
+
+
+def load_database(width, height):
+    # the default pattern database of a board size; built and saved on first use, which takes a while
+    if (width, height) not in DATABASES:
+        DATABASES[width, height] = PatternDatabase(width, height)
+    return DATABASES[width, height]
+
+
+# (weight, node budget) searches tried in turn by solve_board: optimal first, then quicker near-optimal ones
+QUICK_STEPS = ((1, 50000), (1.5, 150000), (2, 1000000))
+
+
+def small_board(width, height):
+    # the shapes IDA* (and the pattern databases) are used for: 3x3 up to 4x4. Thin boards such as
+    # 2x8 are small but have long solutions that IDA* can't reach, so they go to solve_in_parts
+    return 3 <= min(width, height) and max(width, height) <= 4
+
+
+def parts(width, height):
+    # the order solve_in_parts puts tiles home in: the top row or left column of what is left,
+    # whichever is longer, until 3x3 remains, then the rest
+    top = left = 0
+    order = []
+    while height - top > 3 or width - left > 3:
+        if height - top >= width - left:
+            order.append([top * width + x + 1 for x in range(left, width)])
+            top += 1
+        else:
+            order.append([y * width + left + 1 for y in range(top, height)])
+            left += 1
+    order.append([y * width + x + 1 for y in range(top, height) for x in range(left, width)][:-1])
+    return order
+
+
+def place_tiles(width, height, tiles, targets, frozen, weight=3, max_nodes=200000):
+    # weighted A* moving the target tiles home without touching the frozen cells; returns (moves,
+    # nodes expanded), moves None past max_nodes. The other tiles are interchangeable here, so a state is only the blank
+    # and the targets' positions, which keeps the search small however big the board is.
+    moves = [[(name, offset) for name, offset, _ in options if blank + offset not in frozen]
+             for blank, options in enumerate(move_table(width, height))]
+    goals = tuple(tile - 1 for tile in targets)
+
+    def distance(a, b):
+        return abs(a // width - b // width) + abs(a % width - b % width)
+
+    def heuristic(blank, positions):
+        # the targets' Manhattan distance, plus the blank's way to the nearest target not yet home
+        away = [distance(blank, pos) for pos, goal in zip(positions, goals) if pos != goal]
+        return sum(distance(pos, goal) for pos, goal in zip(positions, goals)) + (min(away) - 1 if away else 0)
+
+    start = (tiles.index(0), tuple(tiles.index(tile) for tile in targets))
+    cost = {start: 0}
+    parent = {start: None}
+    frontier = [(weight * heuristic(*start), 0, start)]
+    nodes = 0
+    while frontier:
+        _, g, state = heapq.heappop(frontier)
+        if g > cost[state]:
+            continue
+        blank, positions = state
+        if positions == goals:
+            path = []
+            while parent[state]:
+                state, name = parent[state]
+                path.append(name)
+            return path[::-1], nodes
+        nodes += 1
+        if nodes > max_nodes:
+            return None, nodes
+        for name, offset in moves[blank]:
+            source = blank + offset
+            new = (source, tuple(blank if pos == source else pos for pos in positions))
+            if g + 1 < cost.get(new, g + 2):
+                cost[new] = g + 1
+                parent[new] = (state, name)
+                heapq.heappush(frontier, (g + 1 + weight * heuristic(*new), g + 1, new))
+    return None, nodes
+
+
+def solve_in_parts(width, height, tiles, cancel=None):
+    # solve a board of any size one tile at a time (see parts), freezing each row or column once it
+    # is done; far from the shortest solution, but a fraction of a second even for 8x8.
+    # Returns (moves, nodes expanded), moves None if a tile could not be placed or cancel was set.
+    tiles = list(tiles)
+    if not is_solvable(tiles, width, height):
+        raise Unsolvable('this arrangement can not be solved')
+    path = []
+    frozen = set()
+    nodes = 0
+    for line in parts(width, height):
+        for count in range(1, len(line) + 1):
+            if cancel and cancel.is_set():
+                return None, nodes
+            moves, expanded = place_tiles(width, height, tiles, line[:count], frozen)
+            nodes += expanded
+            if moves is None:
+                return None, nodes
+            tiles = apply_moves(tiles, width, height, moves)
+            path += moves
+        frozen.update(tile - 1 for tile in line)
+    return path, nodes
+
+
+def solve_board(board, steps=QUICK_STEPS, use_database=False, cancel=None):
+    # solve a pzl.py board; returns (moves, nodes expanded, seconds), moves None if it gave up
+    if isinstance(board, PackedBoard):
+        width, height = board.width, board.height
+    else:
+        width, height = len(board), len(board[0])
+    tiles = board_to_tiles(board)
+    database = load_database(width, height) if use_database else None
+    start = time.perf_counter()
+    nodes = 0
+    for weight, max_nodes in steps:
+        solver = Solver(width, height, weight, database)
+        moves = solver.solve(tiles, max_nodes, cancel)
+        nodes += solver.nodes
+        if moves is not None or (cancel and cancel.is_set()):
+            break
+    return moves, nodes, time.perf_counter() - start
+
+
+def quick_solve(board, use_database=False, cancel=None):
+    # solve_board with QUICK_STEPS for small_board shapes, solve_in_parts for the others and for
+    # the rare small board whose node budgets all run out
+    if isinstance(board, PackedBoard):
+        width, height = board.width, board.height
+    else:
+        width, height = len(board), len(board[0])
+    moves, nodes, seconds = None, 0, 0.0
+    if small_board(width, height):
+        moves, nodes, seconds = solve_board(board, QUICK_STEPS, use_database, cancel)
+    if moves is not None or (cancel and cancel.is_set()):
+        return moves, nodes, seconds
+    start = time.perf_counter()
+    moves, more_nodes = solve_in_parts(width, height, board_to_tiles(board), cancel)
+    return moves, nodes + more_nodes, seconds + time.perf_counter() - start